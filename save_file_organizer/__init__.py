@@ -9,6 +9,7 @@ from mods_base import BoolOption, ButtonOption, HiddenOption, build_mod, hook
 from unrealsdk.hooks import Block, Type
 
 from save_file_organizer.actions import SaveListProcessor, get_all_save_data
+from save_file_organizer.bundles import sfo_export, sfo_import
 from save_file_organizer.reloader import register_module
 from save_file_organizer.utils import extract_user_save_path, get_pc
 
@@ -289,6 +290,7 @@ mod = build_mod(
         restore_saves_button,
         defrag_saves_button,
     ],
+    commands=[sfo_export, sfo_import],
     on_enable=_on_enable,
 )
 
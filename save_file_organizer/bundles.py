@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import fnmatch
+import hashlib
+import json
+import re
+import zipfile
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from stat import S_IREAD, S_IWRITE
+from typing import TYPE_CHECKING
+
+from mods_base import command
+from unrealsdk.hooks import prevent_hooking_direct_calls
+
+import save_file_organizer
+from save_file_organizer.actions import SaveListProcessor, _sanitize_character_name, get_all_save_data
+from save_file_organizer.reloader import register_module
+from save_file_organizer.utils import get_pc
+
+if TYPE_CHECKING:
+    import argparse
+    from collections.abc import Iterable
+    from typing import IO
+
+    from common import WillowSaveGameManager
+
+
+_BUNDLE_SUFFIX = ".sfobundle"
+_MANIFEST_NAME = "manifest.json"
+_BUNDLE_VERSION = 1
+_CHUNK_SIZE = 1024 * 1024
+_SAVE_ID_RE = re.compile(r"^Save([0-9A-Fa-f]{4})")
+
+
+@dataclass
+class BundleEntry:
+    member: str
+    file_name: str
+    char_name: str
+    save_id: int
+    size: int
+    sha1: str
+    read_only: bool
+
+
+def _copy_stream(src: IO[bytes], dst: IO[bytes]) -> tuple[int, str]:
+    """Copy between file objects in fixed size chunks, returning bytes copied and SHA1."""
+    sha1 = hashlib.sha1()  # noqa: S324 Integrity check only
+    size = 0
+    while chunk := src.read(_CHUNK_SIZE):
+        sha1.update(chunk)
+        dst.write(chunk)
+        size += len(chunk)
+    return size, sha1.hexdigest()
+
+
+def _resolve_bundle_path(bundle: str) -> Path:
+    """Relative bundle paths are relative to the save folder."""
+    path = Path(bundle)
+    if not path.is_absolute():
+        path = Path(save_file_organizer.save_path_hidden_option.value) / path
+    if not path.suffix:
+        path = path.with_suffix(_BUNDLE_SUFFIX)
+    return path
+
+
+def _parse_id_range(id_range: str) -> tuple[int, int]:
+    """Parse '12' or '10-20' into an inclusive range of save ids, in hex like the Save#### file names."""
+    start, _, end = id_range.partition("-")
+    return int(start, 16), int(end or start, 16)
+
+
+def _taken_save_ids(save_dir: Path) -> set[int]:
+    """Read the save folder once and collect every Save#### id already in use."""
+    taken: set[int] = set()
+    for file in save_dir.iterdir():
+        if match := _SAVE_ID_RE.match(file.name):
+            taken.add(int(match.group(1), 16))
+    return taken
+
+
+def _save_file_name(save_id: int, char_name: str) -> str:
+    """Same format as a renamed save, Save#### - CharacterName.sav."""
+    with prevent_hooking_direct_calls():
+        save_name = get_pc().GetSaveGameNameFromid(save_id)
+    return save_name.replace(".sav", f" - {_sanitize_character_name(char_name)}.sav")
+
+
+def _select_saves(
+    saves: Iterable[WillowSaveGameManager.PlayerSaveData],
+    args: argparse.Namespace,
+) -> list[WillowSaveGameManager.PlayerSaveData]:
+    selected: list[WillowSaveGameManager.PlayerSaveData] = []
+    id_range = _parse_id_range(args.ids) if args.ids else None
+    for save in saves:
+        file_name = Path(save.FilePath).name
+        if args.character and save.UICharacterName.lower() != args.character.lower():
+            continue
+        if id_range and not id_range[0] <= save.SaveGameFileId <= id_range[1]:
+            continue
+        if args.glob and not fnmatch.fnmatch(file_name, args.glob):
+            continue
+        selected.append(save)
+    return selected
+
+
+def export_saves(bundle_path: Path, saves: list[WillowSaveGameManager.PlayerSaveData]) -> None:
+    """
+    Stream the given saves into a single compressed bundle.
+
+    Files are copied in chunks straight into the archive so memory use doesn't depend on the
+    number or size of saves. The manifest is written last, once every entry's hash is known.
+    """
+    save_dir = Path(save_file_organizer.save_path_hidden_option.value)
+    entries: list[BundleEntry] = []
+    with zipfile.ZipFile(bundle_path, mode="w", compression=zipfile.ZIP_DEFLATED) as bundle:
+        for idx, save in enumerate(saves):
+            file_path = save_dir / Path(save.FilePath).name
+            member = f"saves/{idx:05}.sav"
+            with file_path.open("rb") as src, bundle.open(member, mode="w", force_zip64=True) as dst:
+                size, sha1 = _copy_stream(src, dst)
+            entries.append(
+                BundleEntry(
+                    member=member,
+                    file_name=file_path.name,
+                    char_name=save.UICharacterName,
+                    save_id=save.SaveGameFileId,
+                    size=size,
+                    sha1=sha1,
+                    read_only=not file_path.stat().st_mode & S_IWRITE,
+                ),
+            )
+        manifest = {"version": _BUNDLE_VERSION, "entries": [asdict(entry) for entry in entries]}
+        bundle.writestr(_MANIFEST_NAME, json.dumps(manifest, indent=2))
+    print(f"Exported {len(entries)} saves to {bundle_path}")
+
+
+def _is_numeric_id(save_id: int) -> bool:
+    """Whether a save id shows as plain digits in Save#### file names, what a defrag leaves."""
+    return f"{save_id:04X}".isdigit()
+
+
+def plan_import_ids(entries: list[BundleEntry], taken: set[int]) -> dict[str, int]:
+    """
+    Assign every bundle entry a save id that is free in the destination folder.
+
+    Entries keep their original id when it's free and numeric. Those are claimed first so they can't be
+    handed to another entry. The rest get the next free numeric id (same skipping of hex ids as a
+    defrag), so no defrag is needed afterwards.
+    """
+    planned: dict[str, int] = {}
+    for entry in entries:
+        if _is_numeric_id(entry.save_id) and entry.save_id not in taken:
+            taken.add(entry.save_id)
+            planned[entry.member] = entry.save_id
+
+    next_free = -1
+    for entry in entries:
+        if entry.member in planned:
+            continue
+        next_free = SaveListProcessor._get_next_numeric_file_id(next_free)
+        while next_free in taken:
+            next_free = SaveListProcessor._get_next_numeric_file_id(next_free)
+        taken.add(next_free)
+        planned[entry.member] = next_free
+    return planned
+
+
+def import_saves(bundle_path: Path) -> None:
+    """Stream saves out of a bundle into the save folder under pre-planned ids."""
+    save_dir = Path(save_file_organizer.save_path_hidden_option.value)
+    with zipfile.ZipFile(bundle_path, mode="r") as bundle:
+        manifest = json.loads(bundle.read(_MANIFEST_NAME))
+        if manifest.get("version") != _BUNDLE_VERSION:
+            print(f"Unsupported bundle version {manifest.get('version')} in {bundle_path}")
+            return
+        entries = [BundleEntry(**entry) for entry in manifest["entries"]]
+        planned = plan_import_ids(entries, _taken_save_ids(save_dir))
+
+        imported = 0
+        for entry in entries:
+            new_path = save_dir / _save_file_name(planned[entry.member], entry.char_name)
+            with bundle.open(entry.member) as src, new_path.open("xb") as dst:
+                size, sha1 = _copy_stream(src, dst)
+            if size != entry.size or sha1 != entry.sha1:
+                new_path.unlink()
+                print(f"Skipped '{entry.file_name}', contents don't match the bundle manifest")
+                continue
+            if entry.read_only:
+                new_path.chmod(S_IREAD)
+            print(f"Imported save: '{entry.file_name}' -> '{new_path.name}'")
+            imported += 1
+
+    # Refresh the save manager's list so the new saves show up without a restart.
+    get_all_save_data(lambda _: None)
+    print(f"Imported {imported} of {len(entries)} saves from {bundle_path}")
+
+
+@command(description="Export saves in the save folder to a single compressed bundle")
+def sfo_export(args: argparse.Namespace) -> None:  # noqa: D103
+    if not save_file_organizer.mod.is_enabled:
+        print("Need to enable mod before exporting saves.")
+        return
+
+    bundle_path = _resolve_bundle_path(args.bundle)
+
+    def on_save_data(saves: list[WillowSaveGameManager.PlayerSaveData]) -> None:
+        selected = _select_saves(saves, args)
+        if not selected:
+            print("No saves matched the export filters.")
+            return
+        export_saves(bundle_path, selected)
+
+    get_all_save_data(on_save_data)
+
+
+sfo_export.add_argument("bundle", help="Bundle file, relative paths are relative to the save folder")
+sfo_export.add_argument("-c", "--character", help="Only export saves with this character name")
+sfo_export.add_argument("-i", "--ids", help="Only export save ids in this range, as in the Save#### file names, e.g. 0010-0020")
+sfo_export.add_argument("-g", "--glob", help="Only export save files matching this pattern")
+
+
+@command(description="Import saves from a bundle into the save folder")
+def sfo_import(args: argparse.Namespace) -> None:  # noqa: D103
+    if not save_file_organizer.mod.is_enabled:
+        print("Need to enable mod before importing saves.")
+        return
+
+    bundle_path = _resolve_bundle_path(args.bundle)
+    if not bundle_path.exists():
+        print(f"Could not find bundle {bundle_path}")
+        return
+    import_saves(bundle_path)
+
+
+sfo_import.add_argument("bundle", help="Bundle file, relative paths are relative to the save folder")
+
+register_module(__name__)
@@ -7,11 +7,20 @@ from mods_base.mod_factory import build_mod
 from networking import add_network_functions
 from unrealsdk.hooks import Type
 
+import speedrun_practice.commands as srp_commands
 import speedrun_practice.hooks as srp_hooks
 import speedrun_practice.keybinds as srp_keybinds
 import speedrun_practice.options as srp_options
+from speedrun_practice.checkpoints import (
+    cache_loaded_game_state,
+    forget_host_managers,
+    forget_player_stats,
+    forget_saved_game_states,
+)
 from speedrun_practice.network_funcs import *  # noqa: F403
+from speedrun_practice.object_cache import invalidate_object_cache
 from speedrun_practice.reloader import register_module
+from speedrun_practice.state_sync import reset_links
 from speedrun_practice.utilities import (
     GameVersion,
     PlayerClass,
@@ -43,12 +52,23 @@ def _on_enable() -> None:
         run_category = get_run_category(game_version, player_class)
     else:
         run_category = RunCategory.Unknown
+    invalidate_object_cache()  # Could have missed map changes while disabled
+    forget_host_managers()
+    reset_links()
+    # Saves loaded while disabled weren't seen by load_character
+    forget_player_stats()
+    forget_saved_game_states()
 
     srp_options.handle_jakobs_auto(srp_options.jakobs_auto_fire, srp_options.jakobs_auto_fire.value)
     srp_options.handle_travel_portal(
         srp_options.travel_portal_disabled,
         srp_options.travel_portal_disabled.value,
     )
+    srp_options.handle_snapshot_slots(srp_options.snapshot_slots, srp_options.snapshot_slots.value)
+    srp_options.handle_auto_snapshot(
+        srp_options.auto_snapshot_interval,
+        srp_options.auto_snapshot_interval.value,
+    )
     if run_category != RunCategory.AnyPercentGaige:
         srp_hooks.set_catapult_priority.disable()  # type: ignore
     print(f"{NAME} enabled!")
@@ -57,6 +77,7 @@ def _on_enable() -> None:
 def _on_disable() -> None:
     srp_options.handle_jakobs_auto(srp_options.jakobs_auto_fire, False)
     srp_options.handle_travel_portal(srp_options.travel_portal_disabled, False)
+    srp_options.handle_auto_snapshot(srp_options.auto_snapshot_interval, 0)
     print(f"{NAME} disabled.")
 
 
@@ -66,11 +87,16 @@ def load_character(  # noqa: D103
     args: WillowPlayerController.FinishSaveGameLoad.args,
     *_: Any,
 ) -> None:
-    if not args.SaveGame:
-        return
     global player_class, run_category
-    player_class = PlayerClass.from_str(args.SaveGame.PlayerClassDefinition.Name)
-    run_category = get_run_category(game_version, player_class)
+    if args.SaveGame:
+        player_class = PlayerClass.from_str(args.SaveGame.PlayerClassDefinition.Name)
+        run_category = get_run_category(game_version, player_class)
+    # Always enabled for the class tracking above, the rest is only worth doing while the mod is
+    if not mod_instance.is_enabled:
+        return
+    forget_player_stats()  # PlayerStats were just reloaded from the save
+    if args.SaveGame:
+        cache_loaded_game_state(srp_options.save_game_path.value)
 
 
 mod_instance = build_mod(
@@ -79,6 +105,7 @@ mod_instance = build_mod(
     options=srp_options.options,
     keybinds=srp_keybinds.all_keybinds,
     hooks=srp_hooks.hooks,
+    commands=srp_commands.commands,
 )
 
 add_network_functions(mod_instance)
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import os
+import time
+from dataclasses import astuple, dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from speedrun_practice.options import checkpoint_database, save_game_path
+from speedrun_practice.reloader import register_module
+from speedrun_practice.sidecar import CheckpointStore, hash_file, is_available, state_from_json
+from speedrun_practice.utilities import feedback, get_pc
+
+try:
+    from save_file_organizer import SPACE_REPLACE
+except ImportError:  # Save File Organizer isn't installed, so save file names won't have spaces to escape
+    SPACE_REPLACE = None
+
+if TYPE_CHECKING:
+    from speedrun_practice.game_state import GameState
+
+
+@dataclass
+class CatalogEntry:
+    file_name: str
+    save_name: str
+    map_name: str
+    saved_at: float
+    game_state: GameState | None = None  # Only for checkpoints with a matching database row
+
+    @property
+    def search_text(self) -> str:  # noqa: D102
+        return f"{self.file_name} {self.save_name} {self.map_name}".lower()
+
+    def summary(self) -> str:
+        """One line description of the checkpoint for search results."""
+        saved = time.strftime("%Y-%m-%d %H:%M", time.localtime(self.saved_at))
+        gs = self.game_state
+        if gs is None:
+            return f"{self.file_name}: {self.save_name or 'unknown save name'}, saved {saved}"
+        stacks = {
+            "anarchy": gs.anarchy,
+            "buckup": gs.buckup,
+            "freeshot": gs.freeshot,
+            "expertise": gs.expertise,
+            "smasher": gs.smasher,
+            "SMASH": gs.SMASH,
+            "uf": sum(astuple(gs.unstoppable_force)),
+        }
+        stacks_str = ", ".join(f"{name} {count}" for name, count in stacks.items() if count)
+        return (
+            f"{self.file_name}: {self.save_name} on {self.map_name} at ({gs.X:.0f}, {gs.Y:.0f}, {gs.Z:.0f}), "
+            f"weapons {gs.weapons}" + (f", {stacks_str}" if stacks_str else "")
+        )
+
+
+def _save_names_from_game() -> dict[str, str]:
+    """Save name of every save the game listed for the main menu, keyed by file name."""
+    save_manager = get_pc().GetWillowGlobals().GetWillowSaveGameManager()
+    return {Path(save.FilePath).name: save.UICharacterName for save in save_manager.SaveDataLoadedFromList}
+
+
+class CheckpointCatalog:
+    """
+    Searchable list of every save in a save folder.
+
+    Each save is listed by file name, modification time and the save name the game already read for
+    the main menu. When the checkpoint state database is on, saves that still match a stored row also
+    get their map and full game state. Hashing every save to match it against the database is the
+    slow part, so hashes are kept per file and only recomputed when a file's size or modification
+    time changes. Parsed game states are kept per (file name, hash) for the same reason.
+    """
+
+    def __init__(self, save_dir: str) -> None:
+        self.save_dir = save_dir
+        self._hashes: dict[str, tuple[int, int, str]] = {}  # File name -> (size, mtime, hash)
+        self._states: dict[tuple[str, str], GameState] = {}
+
+    def _scan(self) -> dict[str, os.stat_result]:
+        files: dict[str, os.stat_result] = {}
+        with os.scandir(self.save_dir) as entries:
+            for entry in entries:
+                if entry.name.lower().endswith(".sav") and entry.is_file():
+                    files[entry.name] = entry.stat()
+        return files
+
+    def _current_hashes(self, files: dict[str, os.stat_result]) -> dict[str, str]:
+        hashes: dict[str, str] = {}
+        for file_name, stat_result in files.items():
+            cached = self._hashes.get(file_name)
+            if cached is None or cached[:2] != (stat_result.st_size, stat_result.st_mtime_ns):
+                cached = (stat_result.st_size, stat_result.st_mtime_ns, hash_file(Path(self.save_dir) / file_name))
+                self._hashes[file_name] = cached
+            hashes[file_name] = cached[2]
+        for gone in self._hashes.keys() - hashes.keys():
+            del self._hashes[gone]
+        return hashes
+
+    def entries(self) -> list[CatalogEntry]:
+        """Every save in the folder, newest first."""
+        files = self._scan()
+        save_names = _save_names_from_game()
+        entries = {
+            file_name: CatalogEntry(file_name, save_names.get(file_name, ""), "", stat_result.st_mtime)
+            for file_name, stat_result in files.items()
+        }
+
+        if checkpoint_database.value and is_available():
+            hashes = self._current_hashes(files)
+            for file_name, content_hash, save_name, map_name, _, state_json in CheckpointStore(self.save_dir).all_rows():
+                if hashes.get(file_name) != content_hash:
+                    continue
+                game_state = self._states.get((file_name, content_hash))
+                if game_state is None:
+                    game_state = self._states[file_name, content_hash] = state_from_json(state_json)
+                entry = entries[file_name]
+                entry.save_name, entry.map_name, entry.game_state = save_name, map_name, game_state
+
+        return sorted(entries.values(), key=lambda entry: entry.saved_at, reverse=True)
+
+    def search(self, query: str) -> list[CatalogEntry]:
+        """Saves matching every word of the query in their file, save or map name."""
+        start = time.perf_counter()
+        terms = query.lower().split()
+        results = [entry for entry in self.entries() if all(term in entry.search_text for term in terms)]
+        print(f"Found {len(results)} checkpoints in {(time.perf_counter() - start) * 1000:.1f}ms")
+        return results
+
+
+_catalogs: dict[str, CheckpointCatalog] = {}
+
+
+def get_catalog(save_dir: str) -> CheckpointCatalog:  # noqa: D103
+    catalog = _catalogs.get(save_dir)
+    if catalog is None:
+        catalog = _catalogs[save_dir] = CheckpointCatalog(save_dir)
+    return catalog
+
+
+_last_results: list[CatalogEntry] = []
+
+
+def find_checkpoints(query: str) -> list[CatalogEntry]:
+    """Search checkpoints in the save folder and print numbered results for load_checkpoint_file."""
+    _last_results[:] = get_catalog(save_game_path.value).search(query)
+    for i, entry in enumerate(_last_results, 1):
+        print(f"  {i}. {entry.summary()}")
+    return _last_results
+
+
+def load_checkpoint_file(file_or_result: str) -> None:
+    """Load a checkpoint by file name, or by its number in the last search results."""
+    pc = get_pc()
+    if file_or_result.isdigit() and 0 < int(file_or_result) <= len(_last_results):
+        file_name = _last_results[int(file_or_result) - 1].file_name
+    else:
+        file_name = file_or_result
+    if not (Path(save_game_path.value) / file_name).is_file():
+        feedback(pc.PlayerReplicationInfo, f"No save file named {file_name}")
+        return
+    if pc.Pawn:
+        feedback(pc.PlayerReplicationInfo, "Checkpoints can only be loaded from the main menu")
+        return
+    # Same call Save File Organizer uses to load a save from the main menu. Its FixUpLoadString hook
+    # turns SPACE_REPLACE back into spaces, without it the game pads the name to Save#### itself.
+    pc.LoadGame(file_name.replace(" ", SPACE_REPLACE) if SPACE_REPLACE else file_name, None)
+
+
+register_module(__name__)
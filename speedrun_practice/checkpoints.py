@@ -1,16 +1,25 @@
 from __future__ import annotations
 
+import os
+import re
 import stat
+import time
+from dataclasses import dataclass
+from itertools import pairwise
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, cast
 
 from mods_base import hook
-from unrealsdk import find_object, make_struct
+from unrealsdk import logging, make_struct
 from unrealsdk.hooks import Type
 
-from speedrun_practice.game_state import PLAYER_STATS_MAP, ROTATION_STATS, SCALED_STATS, GameState
+from speedrun_practice.game_state import GameState
+from speedrun_practice.object_cache import find_object_cached
+from speedrun_practice.options import checkpoint_database
 from speedrun_practice.reloader import register_module
-from speedrun_practice.skills import HostSkillManager
+from speedrun_practice.sidecar import CheckpointStore, is_available
+from speedrun_practice.skills import ActiveSkillIndex, HostSkillManager
+from speedrun_practice.stat_codec import HEADER_SLOT, decode_game_state, encode_game_state, slots_to_read
 from speedrun_practice.utilities import (
     GameVersion,
     PlayerClass,
@@ -25,6 +34,7 @@ if TYPE_CHECKING:
     from bl2 import (
         AttributeDefinition,
         Object,
+        WillowInventoryManager,
         WillowPlayerController,
         WillowPlayerReplicationInfo,
         WillowWeapon,
@@ -40,7 +50,7 @@ class HostGameStateManager:
     Class for getting or loading game states for target players.
 
     Can only be instantiated/executed by the host, which means this should
-    only be instantiated through a host.json_message network function.
+    only be instantiated through a host network function.
     """
 
     def __init__(
@@ -57,14 +67,14 @@ class HostGameStateManager:
     def clipsize_attr(self) -> AttributeDefinition:  # noqa: D102
         return cast(
             "AttributeDefinition",
-            find_object("AttributeDefinition", "D_Attributes.Weapon.WeaponClipSize"),
+            find_object_cached("AttributeDefinition", "D_Attributes.Weapon.WeaponClipSize"),
         )
 
     @property
     def shotcost_attr(self) -> AttributeDefinition:  # noqa: D102
         return cast(
             "AttributeDefinition",
-            find_object("AttributeDefinition", "D_Attributes.Weapon.WeaponShotCost"),
+            find_object_cached("AttributeDefinition", "D_Attributes.Weapon.WeaponShotCost"),
         )
 
     def get_game_state(self) -> GameState:
@@ -76,44 +86,40 @@ class HostGameStateManager:
         game_state.crit = round(self.target_pc.CurrentInstantHitCriticalHitBonus, 2)
 
         # Buck up, anarchy, and unstoppable force
+        # All stack counts below come from one pass over ActiveSkills.
+        skill_index = self.host_skill_manager.get_active_skill_index()
+
+        def stack_count(skill_name: str) -> int:
+            return self.host_skill_manager.get_logical_stacks(skill_name, skill_index)
 
         game_state.anarchy = int(
             self.host_skill_manager.get_designer_attribute_value(
                 "GD_Tulip_Mechromancer_Skills.Misc.Att_Anarchy_NumberOfStacks",
             ),
         )
-        game_state.buckup = len(
-            self.host_skill_manager.get_skill_definition_stacks(["Skill_ShieldBoost_Player"]),
-        )
+        game_state.buckup = stack_count("Skill_ShieldBoost_Player")
         game_state.unstoppable_force = self.host_skill_manager.get_skill_stacks_by_grade(
             ["UnstoppableForce"],
+            skill_index,
         )
 
         # Expertise
-        game_state.expertise = len(
-            self.host_skill_manager.get_skill_definition_stacks(["Expertise_MovementSpeed"]),
-        )
+        game_state.expertise = stack_count("Expertise_MovementSpeed")
 
         # Smasher stacks
-        game_state.smasher = len(
-            self.host_skill_manager.get_skill_definition_stacks(["Skill_EvilSmasher"]),
-        )
-        game_state.SMASH = len(
-            self.host_skill_manager.get_skill_definition_stacks(["Skill_EvilSmasher_SMASH"]),
-        )
+        game_state.smasher = stack_count("Skill_EvilSmasher")
+        game_state.SMASH = stack_count("Skill_EvilSmasher_SMASH")
 
         # Free shots: -1 value implies equal to current mag whenever playing on patches that
         # support it.
+        freeshot_stacks = stack_count("Skill_VladofHalfAmmo")
         if (
-            len(self.host_skill_manager.get_skill_definition_stacks(["Skill_VladofHalfAmmo"]))
-            == self.target_pc.GetActiveOrBestWeapon().ShotCostBaseValue
+            freeshot_stacks == self.target_pc.GetActiveOrBestWeapon().ShotCostBaseValue
             and self.game_version.in_group([GameVersion.v_stack])
         ):
             game_state.freeshot = -1
         else:
-            game_state.freeshot = len(
-                self.host_skill_manager.get_skill_definition_stacks(["Skill_VladofHalfAmmo"]),
-            )
+            game_state.freeshot = freeshot_stacks
 
         # Equipped weapons returned from GetEquippedWeapons as out params
         equipped_weapons = cast(
@@ -167,55 +173,73 @@ class HostGameStateManager:
 
         return game_state
 
-    def load_game_state(self, load_state: GameState) -> None:  # noqa: C901
-        """Loads the game state by applying glitches and the saved map position."""
+    def set_active_weapon(
+        self,
+        inventory_manager: WillowInventoryManager,
+        weapons: list[WillowWeapon],
+        active_slot: int,
+    ) -> int:
+        """
+        Make the weapon in active_slot the active one without changing drop order.
+
+        Drop pickups of every other weapon leave the target weapon active. Nothing is moved when it
+        already is, or when that slot is empty. Returns the number of inventory calls made.
+        """
+        target = next((weapon for weapon in weapons if weapon.QuickSelectSlot == active_slot), None)
+        # Pawn.Weapon can still be the old weapon, or None, while a switch like the one at the end of the
+        # gunzerk reset is pending, GetActiveOrBestWeapon accounts for that.
+        if target is None or self.target_pc.GetActiveOrBestWeapon() == target:
+            return 0
+
+        inventory_calls = 0
+        for weapon in weapons:
+            if weapon != target:
+                inventory_manager.RemoveFromInventory(weapon)
+                inventory_manager.AddInventory(weapon, False)
+                inventory_calls += 2
 
+        # Now we've messed up drop order, so we're going to reset our InventoryChain to what it was
+        # previously
+        inventory_manager.InventoryChain = weapons[0]
+        for weapon, next_weapon in pairwise(weapons):
+            weapon.Inventory = next_weapon
+        weapons[-1].Inventory = None
+        return inventory_calls
+
+    def load_game_state(self, load_state: GameState) -> str:
+        """Loads the game state by applying glitches and the saved map position, returning a summary for the player."""
         if load_state.X == 0 and load_state.Y == 0:
-            feedback(self.target_pri, "No speedrun practice data found in current save file")
-            return
+            return "No speedrun practice data found in current save file"
+        merge_msg = self.load_weapons(load_state)
+        return self.load_skills_and_position(load_state, merge_msg, self.host_skill_manager.get_active_skill_index())
+
+    def load_weapons(self, load_state: GameState) -> str:  # noqa: C901
+        """
+        First part of a load: active weapon, gunzerk, clips and merges. Returns the merge summary.
 
+        Weapon changes can activate and deactivate skills, so this has to run before ActiveSkills is
+        read for load_skills_and_position.
+        """
         # Cancel Sal's Gunzerk, causes issues with drop reloads later
         if self.player_class == PlayerClass.Salvador:
             from speedrun_practice.keybinds import reset_gunzerk_and_weapons
 
             reset_gunzerk_and_weapons()
 
-        (
-            gaige_msg,
-            freeshot_msg,
-            smasher_msg,
-            merge_msg,
-            expertise_msg,
-            modifier_msg,
-            cooldown_msg,
-        ) = "", "", "", "", "", "", ""
-
-        # Equipped weapon and clip sizes
+        merge_msg = ""
+
+        # Equipped weapon and clip sizes. Chain is walked once and reused for everything below.
         inventory_manager = self.target_pc.GetPawnInventoryManager()
         weapon = cast("WillowWeapon", inventory_manager.InventoryChain)
         weapons: list[WillowWeapon] = []
         while weapon:
             weapons.append(weapon)
             weapon = cast("WillowWeapon", weapon.Inventory)
+        weapon_digits = [int(digit) for digit in str(load_state.weapons).zfill(5)]  # Active slot, then merges
 
-        for weapon in weapons:
-            # Use drop pickups to get our desired active weapon in place instantly
-            if (
-                weapon
-                and load_state.weapons > 0
-                and int(str(load_state.weapons).zfill(5)[0]) != weapon.QuickSelectSlot
-            ):
-                inventory_manager.RemoveFromInventory(weapon)
-                inventory_manager.AddInventory(weapon, False)
-        # Now we've messed up drop order, so we're going to reset our InventoryChain to what it was
-        # previously
-        inventory_manager.InventoryChain = None
-        for i in range(len(weapons)):
-            if i == 0:
-                inventory_manager.InventoryChain = weapons[i]
-            else:
-                weapons[i - 1].Inventory = weapons[i]
-                weapons[i].Inventory = None
+        if load_state.weapons > 0:
+            inventory_calls = self.set_active_weapon(inventory_manager, weapons, weapon_digits[0])
+            logging.misc(f"Setting active weapon took {inventory_calls} inventory calls")
 
         # Remaining gunzerk duration
         # Doing this here so that we get gunzerk started up before setting up ammo in clips
@@ -241,7 +265,7 @@ class HostGameStateManager:
 
         for weapon in weapons:
             # Set clip sizes - only for host since it doesn't seem to work correctly on off-host.
-            if weapon and self.target_pri.bIsPartyLeader:
+            if self.target_pri.bIsPartyLeader:
                 saved_clip = getattr(load_state, f"w{weapon.QuickSelectSlot}_clip")
                 if saved_clip <= 0:
                     weapon.ReloadCnt = int(self.clipsize_attr.GetValue(weapon)[0])
@@ -250,11 +274,21 @@ class HostGameStateManager:
                 weapon.LastReloadCnt = weapon.ReloadCnt
 
             # Merge weapon maybe
-            if int(str(load_state.weapons).zfill(5)[weapon.QuickSelectSlot]) == 1:
+            if weapon_digits[weapon.QuickSelectSlot] == 1:
                 weapon.ApplyAllExternalAttributeEffects()
                 if merge_msg == "":
                     merge_msg = "\nWeapons Merged:"
                 merge_msg = merge_msg + "\n\t" + weapon.GetShortHumanReadableName()
+        return merge_msg
+
+    def load_skills_and_position(self, load_state: GameState, merge_msg: str, skill_index: ActiveSkillIndex) -> str:
+        """
+        Second part of a load: skill stacks, modifiers, position and cooldown. Returns the full summary.
+
+        skill_index only has to be built after this player's load_weapons. It's grouped by player, so
+        one index can be shared by every player in a party load.
+        """
+        gaige_msg, freeshot_msg, smasher_msg, expertise_msg, modifier_msg, cooldown_msg = "", "", "", "", "", ""
 
         # Buck up, free shots, anarchy, smasher, and expertise. After weapon stuff so no issues with
         # deactivations.
@@ -265,49 +299,36 @@ class HostGameStateManager:
         else:
             freeshot_stacks = load_state.freeshot
 
-        self.host_skill_manager.set_skill_stacks(
-            freeshot_stacks,
-            "GD_Weap_Launchers.Skills.Skill_VladofHalfAmmo",
-        )
-        if freeshot_stacks > 0:
-            freeshot_msg = f"\nFree Shot Stacks: {freeshot_stacks}"
-
-        self.host_skill_manager.set_skill_stacks(
-            load_state.smasher,
-            "GD_Weap_AssaultRifle.Skills.Skill_EvilSmasher",
-        )
-        self.host_skill_manager.set_skill_stacks(
-            load_state.SMASH,
-            "GD_Weap_AssaultRifle.Skills.Skill_EvilSmasher_SMASH",
+        self.host_skill_manager.set_skill_stacks_batch(
+            {
+                "GD_Weap_Launchers.Skills.Skill_VladofHalfAmmo": freeshot_stacks,
+                "GD_Weap_AssaultRifle.Skills.Skill_EvilSmasher": load_state.smasher,
+                "GD_Weap_AssaultRifle.Skills.Skill_EvilSmasher_SMASH": load_state.SMASH,
+                "GD_Tulip_DeathTrap.Skills.Skill_ShieldBoost_Player": load_state.buckup,
+                "GD_Soldier_Skills.Gunpowder.Expertise_MovementSpeed": load_state.expertise,
+            },
+            skill_index,
         )
-        if load_state.smasher > 0 or load_state.SMASH > 0:
-            smasher_msg = f"\nSmasher Chance Stacks: {load_state.smasher}"
-            smasher_msg += f"\nSmasher SMASH Stacks: {load_state.SMASH}"
-
         self.host_skill_manager.set_designer_attribute_value(
             load_state.anarchy,
             "GD_Tulip_Mechromancer_Skills.Misc.Att_Anarchy_NumberOfStacks",
         )
-
-        self.host_skill_manager.set_skill_stacks(
-            load_state.buckup,
-            "GD_Tulip_DeathTrap.Skills.Skill_ShieldBoost_Player",
-        )
         self.host_skill_manager.set_skill_stacks_by_grade(
             load_state.unstoppable_force,
             "GD_Tulip_Mechromancer_Skills.BestFriendsForever.UnstoppableForce",
+            skill_index,
         )
+
+        if freeshot_stacks > 0:
+            freeshot_msg = f"\nFree Shot Stacks: {freeshot_stacks}"
+        if load_state.smasher > 0 or load_state.SMASH > 0:
+            smasher_msg = f"\nSmasher Chance Stacks: {load_state.smasher}"
+            smasher_msg += f"\nSmasher SMASH Stacks: {load_state.SMASH}"
         if load_state.buckup > 0:
             gaige_msg += f"\nBuck Up Stacks: {load_state.buckup}"
         if load_state.anarchy > 0:
             gaige_msg += f"\nAnarchy Stacks: {load_state.anarchy}"
-        if load_state.un_force > 0:
-            gaige_msg += f"{load_state.unstoppable_force_str()}"
-
-        self.host_skill_manager.set_skill_stacks(
-            load_state.expertise,
-            "GD_Soldier_Skills.Gunpowder.Expertise_MovementSpeed",
-        )
+        gaige_msg += load_state.unstoppable_force_str()
         if load_state.expertise > 0:
             expertise_msg += f"\nExpertise Stacks: {load_state.expertise}"
 
@@ -328,7 +349,7 @@ class HostGameStateManager:
             if load_state.cooldown > 0:
                 cooldown_msg = f"\nCooldown Remaining: {load_state.cooldown}"
 
-        msg = (
+        return (
             "Game State Loaded\n"
             + gaige_msg
             + freeshot_msg
@@ -338,7 +359,152 @@ class HostGameStateManager:
             + merge_msg
             + modifier_msg
         )
-        feedback(self.target_pri, msg)
+
+
+@dataclass
+class ManagerCacheStats:
+    hits: int = 0
+    misses: int = 0
+    dropped: int = 0  # Entries replaced because the player's PRI or controller changed
+
+    @property
+    def hit_rate(self) -> float:  # noqa: D102
+        total = self.hits + self.misses
+        return self.hits / total if total else 0
+
+    def __str__(self) -> str:
+        return (
+            f"Host manager cache: {len(_host_managers)} players, {self.hits} hits, {self.misses} misses "
+            f"({self.hit_rate:.1%} hit rate), {self.dropped} dropped"
+        )
+
+
+_host_managers: dict[int, HostGameStateManager] = {}  # Keyed by PlayerID
+manager_stats = ManagerCacheStats()
+
+
+def get_host_game_state_manager(pri: WillowPlayerReplicationInfo) -> HostGameStateManager:
+    """
+    HostGameStateManager for a player, reused across requests until the next map change or they leave.
+
+    A player who leaves and rejoins gets a new PRI and controller, so a cached manager that doesn't
+    match them anymore is rebuilt.
+    """
+    manager = _host_managers.get(pri.PlayerID)
+    if manager is not None:
+        if manager.target_pri == pri and manager.target_pc == pri.Owner:
+            manager_stats.hits += 1
+            return manager
+        manager_stats.dropped += 1
+    manager_stats.misses += 1
+    manager = _host_managers[pri.PlayerID] = HostGameStateManager(pri)
+    return manager
+
+
+def get_host_skill_manager(pri: WillowPlayerReplicationInfo) -> HostSkillManager:  # noqa: D103
+    return get_host_game_state_manager(pri).host_skill_manager
+
+
+def forget_host_managers() -> None:  # noqa: D103
+    _host_managers.clear()
+
+
+def forget_host_manager(player_id: int) -> None:
+    """Drop the manager for a player who left."""
+    _host_managers.pop(player_id, None)
+
+
+@hook("WillowGame.WillowPlayerController:WillowClientShowLoadingMovie", Type.POST)
+def forget_host_managers_on_map_change(*_: Any) -> None:
+    """Managers hold on to controllers and the skill manager, which don't survive travel."""
+    forget_host_managers()
+
+
+# Stat values last written to or read from the pc for each save file. PlayerStats only gets
+# reloaded from disk when a save is loaded, so until then these match what's in memory.
+_known_player_stats: dict[str, dict[str, int]] = {}
+
+
+def forget_player_stats() -> None:
+    """Forget known stat values, needed whenever PlayerStats is reloaded from a save."""
+    _known_player_stats.clear()
+
+
+# Decoded game state per save file, so loading the same state over and over needs no stat reads or disk access.
+_saved_game_states: dict[str, GameState] = {}
+
+
+def forget_saved_game_states() -> None:
+    """Forget decoded game states, needed when saves may have been loaded without us seeing it."""
+    _saved_game_states.clear()
+
+
+def cache_loaded_game_state(save_dir: str) -> None:
+    """Decode the game state of the save that was just loaded, dropping anything cached for older loads."""
+    _saved_game_states.clear()
+    saver = CheckpointSaver(None, save_dir)
+    _saved_game_states[saver.current_file_name] = saver.get_saved_game_state()
+
+
+def get_current_game_state(save_dir: str) -> GameState:
+    """Game state saved in the current save, from the cache when we have it."""
+    file_name = get_pc().GetWillowGlobals().GetWillowSaveGameManager().LastLoadedFilePath
+    game_state = _saved_game_states.get(file_name)
+    if game_state is None:
+        game_state = _saved_game_states[file_name] = CheckpointSaver(None, save_dir).get_saved_game_state()
+    return game_state
+
+
+_SAVE_FILE_NAME = re.compile(r"Save([0-9A-F]{4})\.sav", re.IGNORECASE)
+
+
+class SaveNumberAllocator:
+    """
+    Hands out unused Save####.sav file names for a save folder.
+
+    The folder is read once and numbers we hand out are reserved in memory, so finding a free name
+    doesn't need a stat call per taken number. Files created by something else since the last scan
+    are caught by checking the chosen name once, and rescanning if it turns out to be taken.
+    """
+
+    def __init__(self, save_dir: str) -> None:
+        self.save_dir = save_dir
+        self.taken: set[str] = set()  # Upper case four character save numbers
+        self.pending: set[str] = set()  # Handed out, but not seen on disk yet
+        self.scan()
+
+    def scan(self) -> None:
+        """Re-read the folder, keeping numbers handed out whose files haven't been written yet."""
+        with os.scandir(self.save_dir) as entries:
+            on_disk = {match.group(1).upper() for entry in entries if (match := _SAVE_FILE_NAME.fullmatch(entry.name))}
+        self.pending -= on_disk
+        self.taken = on_disk | self.pending
+
+    def allocate(self, after: int, decimal: bool) -> str:
+        """Reserve the first free save number above after, in decimal or hex."""
+        path_num = after
+        while True:
+            path_num += 1
+            number = (f"{path_num}" if decimal else f"{path_num:x}").zfill(4).upper()
+            if number in self.taken:
+                continue
+            filename = f"Save{number}.sav"
+            if (Path(self.save_dir) / filename).exists():
+                self.scan()
+                continue
+            self.taken.add(number)
+            self.pending.add(number)
+            return filename
+
+
+_allocators: dict[str, SaveNumberAllocator] = {}
+
+
+def get_save_number_allocator(save_dir: str) -> SaveNumberAllocator:  # noqa: D103
+    allocator = _allocators.get(save_dir)
+    if allocator is None:
+        allocator = _allocators[save_dir] = SaveNumberAllocator(save_dir)
+    return allocator
 
 
 class CheckpointSaver:
@@ -357,9 +523,13 @@ class CheckpointSaver:
             self.pc.GetWillowGlobals().GetWillowSaveGameManager().LastLoadedFilePath
         )
         self.current_file_path = self.get_current_file_path()
-        self.new_filename = self.get_next_open_filename()
+        self._new_filename: str | None = None
 
         self.game_state = game_state
+        self.encoded_stats: dict[str, int] = {}
+        self.engine_calls = 0
+        self.written_files: list[tuple[str, str]] = []  # (file name, UI name) saved this checkpoint
+        self.timings: dict[str, float] = {}  # Seconds spent per save phase
 
     def get_current_file_path(self) -> str:
         """
@@ -373,6 +543,13 @@ class CheckpointSaver:
             raise FileNotFoundError("Error finding current filepath")
         return str(current_file_path)
 
+    @property
+    def new_filename(self) -> str:
+        """File name for a new checkpoint copy, only allocated the first time it's needed."""
+        if self._new_filename is None:
+            self._new_filename = self.get_next_open_filename()
+        return self._new_filename
+
     def get_next_open_filename(self) -> str:
         """
         Finds next available save number based on files in the save directory.
@@ -390,67 +567,105 @@ class CheckpointSaver:
                 path_num = 0
                 decimal = True
 
-        while True:
-            path_num = path_num + 1
-            if decimal:
-                filepath = "Save" + f"{path_num}".zfill(4).upper() + ".sav"
-            else:
-                filepath = "Save" + f"{path_num:x}".zfill(4).upper() + ".sav"
-            if not (Path(self.save_dir) / filepath).exists():
-                break
-        return filepath
+        return get_save_number_allocator(self.save_dir).allocate(path_num, decimal)
 
     def save_game_copy(self) -> None:
         """Saves a new copy of the game."""
         # Out param returned as return value
         current_save_name: str = self.pc.GetPlayerUINamePreference("")[1]
+        self.engine_calls += 1
         if not self.new_save_name:
             raise ValueError("New save name not set.")
+        # The UI name lives inside the compressed and hashed save payload, so the copy can't be made by
+        # patching bytes of the current save. Both files need their own engine save.
+        start = time.perf_counter()
         self.pc.SetPlayerUINamePreference(self.new_save_name)
+        self.engine_calls += 1
         self.pc.SaveGame(self.new_filename)
+        self.engine_calls += 1
         (Path(self.save_dir) / self.new_filename).chmod(stat.S_IREAD)
+        self.timings["copy save"] = time.perf_counter() - start
 
+        start = time.perf_counter()
         self.pc.SetPlayerUINamePreference(current_save_name)
+        self.engine_calls += 1
         self.pc.SaveGame(self.current_file_name)
+        self.engine_calls += 1
+        self.timings["current save"] = time.perf_counter() - start
+        self.written_files += [
+            (self.new_filename, self.new_save_name),
+            (self.current_file_name, current_save_name),
+        ]
 
     def overwrite_save(self) -> None:
         """Overwrites current save with new checkpoint."""
+        start = time.perf_counter()
         Path(self.current_file_path).chmod(stat.S_IWRITE)
         self.pc.SaveGame(self.current_file_name)
+        self.engine_calls += 1
         Path(self.current_file_path).chmod(stat.S_IREAD)
+        self.timings["overwrite save"] = time.perf_counter() - start
+        self.written_files.append((self.current_file_name, self.pc.GetPlayerUINamePreference("")[1]))
+        self.engine_calls += 1
 
     def set_player_stats(self) -> None:
         """Sets the player stats on the pc, intent is to save game right after."""
+        if self.game_state is None:
+            raise ValueError("Game state not set.")
+        # Only stats that differ from what's already on the pc get written.
         stats = self.pc.PlayerStats
-        for stats_name, name in PLAYER_STATS_MAP.items():
-            if not name:
-                continue
-            val = getattr(self.game_state, name)
-            if name in SCALED_STATS:
-                val = int(val * 100)
-            stats.SetIntStat(stats_name, val)
+        self.encoded_stats = encode_game_state(self.game_state)
+        known = _known_player_stats.setdefault(self.current_file_name, {})
+        for stat_name, value in self.encoded_stats.items():
+            if known.get(stat_name) != value:
+                stats.SetIntStat(stat_name, value)
+                known[stat_name] = value
+                self.engine_calls += 1
 
     def get_player_stats(self) -> GameState:
         """Get current player stats from pc."""
         stats = self.pc.PlayerStats
-        game_state = GameState()
-        for stats_name, name in PLAYER_STATS_MAP.items():
-            val = stats.GetIntStat(stats_name)
-            if name in SCALED_STATS:
-                val = val / 100
-            if name in ROTATION_STATS:
-                val = int(val)
-            if name:
-                setattr(game_state, name, val)
-        return game_state
+        values = {HEADER_SLOT: stats.GetIntStat(HEADER_SLOT)}
+        for stat_name in slots_to_read(values[HEADER_SLOT]):
+            values[stat_name] = stats.GetIntStat(stat_name)
+        _known_player_stats.setdefault(self.current_file_name, {}).update(values)
+        return decode_game_state(values)
 
     def save_checkpoint(self, overwrite: bool = False) -> None:
         """Saves game and game state."""
+        start = time.perf_counter()
         self.set_player_stats()
+        self.timings["player stats"] = time.perf_counter() - start
+        stat_writes = self.engine_calls
         if not overwrite:
             self.save_game_copy()
         else:
             self.overwrite_save()
+        # What loading these files back would give us, at the precision the player stats keep
+        saved_state = decode_game_state(self.encoded_stats)
+        if checkpoint_database.value and is_available() and self.game_state is not None:
+            start = time.perf_counter()
+            saved_state = self.game_state
+            CheckpointStore(self.save_dir).put(
+                [(file_name, save_name, saved_state) for file_name, save_name in self.written_files],
+                self.pc.WorldInfo.GetMapName(True),
+            )
+            self.timings["database"] = time.perf_counter() - start
+        for file_name, _ in self.written_files:
+            _saved_game_states[file_name] = saved_state
+        phases = ", ".join(f"{phase} {secs * 1000:.1f}ms" for phase, secs in self.timings.items())
+        logging.misc(
+            f"Checkpoint save took {self.engine_calls} engine calls, "
+            f"{stat_writes} of {len(self.encoded_stats)} stats written ({phases})",
+        )
+
+    def get_saved_game_state(self) -> GameState:
+        """Game state stored for the current save, from the database when enabled, else player stats."""
+        if checkpoint_database.value and is_available():
+            stored_state = CheckpointStore(self.save_dir).get(self.current_file_name)
+            if stored_state is not None:
+                return stored_state
+        return self.get_player_stats()
 
     def touch_current_save(self) -> None:
         """Touch current save so that it moves to top of list in game."""
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from mods_base import command
+
+from speedrun_practice import host_queue, net_stats, object_cache
+from speedrun_practice.catalog import find_checkpoints, load_checkpoint_file
+from speedrun_practice.checkpoints import manager_stats
+from speedrun_practice.network_funcs import start_party_load
+from speedrun_practice.reloader import register_module
+
+if TYPE_CHECKING:
+    import argparse
+
+    from mods_base import AbstractCommand
+
+
+@command(description="Print Speedrun Practice cache statistics")
+def srp_cache(args: argparse.Namespace) -> None:  # noqa: D103, ARG001
+    print(object_cache.stats)
+    print(manager_stats)
+
+
+@command(description="Search checkpoints by save name, map or file name")
+def srp_find(args: argparse.Namespace) -> None:  # noqa: D103
+    find_checkpoints(" ".join(args.query))
+
+
+srp_find.add_argument("query", nargs="*", help="Words that must all match, leave empty to list everything")
+
+
+@command(description="Load a checkpoint from the main menu, by file name or srp_find result number")
+def srp_load(args: argparse.Namespace) -> None:  # noqa: D103
+    load_checkpoint_file(args.checkpoint)
+
+
+srp_load.add_argument("checkpoint", help="Save file name, or result number from the last srp_find")
+
+
+@command(description="Print Speedrun Practice co-op network statistics")
+def srp_net(args: argparse.Namespace) -> None:  # noqa: D103, ARG001
+    print(net_stats.summary())
+    print(host_queue.summary())
+
+
+@command(description="Load checkpoint states for the whole party at once (host only)")
+def srp_party_load(args: argparse.Namespace) -> None:  # noqa: D103
+    start_party_load(args.shared)
+
+
+srp_party_load.add_argument(
+    "-s",
+    "--shared",
+    action="store_true",
+    help="Load the host's current save state for everyone, instead of each player's own",
+)
+
+commands: list[AbstractCommand] = [srp_cache, srp_find, srp_load, srp_net, srp_party_load]
+
+register_module(__name__)
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, field, fields
+from dataclasses import astuple, dataclass, field, fields
 from typing import TYPE_CHECKING, cast
 
 from speedrun_practice.reloader import register_module
@@ -9,8 +9,7 @@ from speedrun_practice.utilities import Position, get_pc
 if TYPE_CHECKING:
     from bl2 import AttributeModifier, WillowWeapon
 
-_MAX_UF_STACKS = 63  # Can't store more than this in our player stats.
-
+# Layout used before checkpoints were written with stat_codec. Only needed to read old saves.
 SCALED_STATS = (
     "X",
     "Y",
@@ -139,7 +138,11 @@ class GameState:
     weapons: int = 0
     expertise: int = 0
     smasher: int = 0
-    un_force: int = 0
+    uf_g1: int = 0  # Unstoppable Force stacks by grade
+    uf_g2: int = 0
+    uf_g3: int = 0
+    uf_g4: int = 0
+    uf_g5: int = 0
     cooldown: float = 0
     gunzerk: float = 0  # 0 means not active
     X: float = 0
@@ -181,8 +184,7 @@ class GameState:
                 "w2_clip",
                 "w3_clip",
                 "w4_clip",
-                "un_force",
-            ] and fld.name[:2] not in ("a_", "c_"):
+            ] and fld.name[:2] not in ("a_", "c_", "uf"):
                 value = getattr(self, fld.name)
                 if fld.name == "freeshot" and value == -1:
                     weap = cast("WillowWeapon", get_pc().GetActiveOrBestWeapon())
@@ -209,7 +211,7 @@ class GameState:
     def unstoppable_force_str(self) -> str:
         """String message for UF stacks."""
         result = ""
-        if self.un_force > 0:
+        if any(astuple(self.unstoppable_force)):
             result += "\nUF Stacks by Grade:"
             stacks = self.unstoppable_force
             for field in fields(self.unstoppable_force):
@@ -218,31 +220,11 @@ class GameState:
 
     @property
     def unstoppable_force(self) -> GradeStacks:  # noqa: D102
-        packed = self.un_force
-        un_force = GradeStacks()
-        un_force.G1 = packed & 0b111111
-        un_force.G2 = (packed >> 6) & 0b111111
-        un_force.G3 = (packed >> 12) & 0b111111
-        un_force.G4 = (packed >> 18) & 0b111111
-        un_force.G5 = (packed >> 24) & 0b111111
-        return un_force
+        return GradeStacks(self.uf_g1, self.uf_g2, self.uf_g3, self.uf_g4, self.uf_g5)
 
     @unstoppable_force.setter
     def unstoppable_force(self, uf_stacks: GradeStacks) -> None:
-        for fld in fields(uf_stacks):
-            value = getattr(uf_stacks, fld.name)
-            if value > _MAX_UF_STACKS:
-                setattr(uf_stacks, fld.name, _MAX_UF_STACKS)
-                print(
-                    f"Capping Unstoppable Force grade {fld.name} at {_MAX_UF_STACKS} stacks. Tried "
-                    f"to set {value} stacks.",
-                )
-        packed = uf_stacks.G1 & 0b111111
-        packed |= (uf_stacks.G2 & 0b111111) << 6
-        packed |= (uf_stacks.G3 & 0b111111) << 12
-        packed |= (uf_stacks.G4 & 0b111111) << 18
-        packed |= (uf_stacks.G5 & 0b111111) << 24
-        self.un_force = packed
+        self.uf_g1, self.uf_g2, self.uf_g3, self.uf_g4, self.uf_g5 = astuple(uf_stacks)
 
     @property
     def external_modifiers(self) -> ExternalAttributeModifiers:  # noqa: D102
@@ -1,11 +1,14 @@
 from __future__ import annotations
 
+import time
 from dataclasses import dataclass
 from typing import TYPE_CHECKING, Any, cast
 
-from unrealsdk import find_all, find_object, load_package
+from unrealsdk import find_all, logging
 from unrealsdk.hooks import Type, add_hook, prevent_hooking_direct_calls, remove_hook
 
+from speedrun_practice.object_cache import find_object_cached, load_package
+from speedrun_practice.options import gear_farm_attempts, gear_farm_budget
 from speedrun_practice.reloader import register_module
 from speedrun_practice.utilities import feedback, get_pc
 
@@ -39,6 +42,26 @@ class GearSource:
     sort_func: Callable[[WillowWeapon | WillowShield], float] = lambda _: 1
 
 
+@dataclass
+class FarmReport:
+    """How a farm for one gear source went."""
+
+    map_name: str
+    attempts: int = 0
+    spawned: int = 0
+    seconds: float = 0
+    qualified: bool = False
+    best: WillowWeapon | WillowShield | None = None
+
+    def __str__(self) -> str:
+        best = self.best.GetShortHumanReadableName() if self.best else "nothing"
+        outcome = "found" if self.qualified else "budget ran out, best so far"
+        return (
+            f"{self.map_name}: {self.attempts} attempts, {self.spawned} items spawned in "
+            f"{self.seconds * 1000:.0f}ms, {outcome}: {best}"
+        )
+
+
 def is_jakobs_multi_barrel(inv: WillowWeapon | WillowShield) -> bool:
     """Determines if a weapon is a multi-barrel jakobs shotgun."""
     if inv.Class.Name != "WillowWeapon":  # type: ignore
@@ -66,7 +89,7 @@ def get_total_damage(inv: WillowWeapon | WillowShield) -> float:
         return 0
     projectiles_attr = cast(
         "AttributeDefinition",
-        find_object("AttributeDefinition", "D_Attributes.Weapon.WeaponProjectilesPerShot"),
+        find_object_cached("AttributeDefinition", "D_Attributes.Weapon.WeaponProjectilesPerShot"),
     )
     projectiles = projectiles_attr.GetValue(inv)[0]
     return inv.InstantHitDamageBaseValue * projectiles
@@ -89,7 +112,7 @@ def get_impact_damage(inv: WillowWeapon | WillowShield) -> float:
         return 0
     impact_damage_attr = cast(
         "AttributeDefinition",
-        find_object("AttributeDefinition", "D_Attributes.Shield.ImpactShield_DamageBonus"),
+        find_object_cached("AttributeDefinition", "D_Attributes.Shield.ImpactShield_DamageBonus"),
     )
     return impact_damage_attr.GetValue(inv)[0]
 
@@ -243,7 +266,7 @@ class GearRandomizer:
         load_package("Sanctuary_P")  # Needed for maps that don't have gun vendors.
         self.game_stage_variance = cast(
             "AttributeInitializationDefinition",
-            find_object(
+            find_object_cached(
                 "AttributeInitializationDefinition",
                 "GD_Economy.VendingMachine.Init_VendingMachine_LootGamestageVariance",
             ),
@@ -258,7 +281,7 @@ class GearRandomizer:
         """Spawn inventory from any ItemPoolDefinition."""
         default_item_pool = cast(
             "ItemPool",
-            find_object("ItemPool", "WillowGame.Default__ItemPool"),
+            find_object_cached("ItemPool", "WillowGame.Default__ItemPool"),
         )
         spawned_items: list[WillowWeapon | WillowShield] = []
 
@@ -289,27 +312,57 @@ class GearRandomizer:
         return item.DefinitionData.GameStage
 
     def spawn_from_gear_source(self, gear_source: GearSource) -> WillowWeapon | WillowShield | None:
-        """Spawn an item from a GearSource instance."""
+        """
+        Spawn an item from a GearSource instance.
+
+        Farm sources keep spawning until an item qualifies, or the attempt and time budgets from
+        the options run out. Then the best item spawned by sort_func is used even if it doesn't
+        qualify.
+        """
         if gear_source.loot_variance:
             game_stage_variance = cast(
                 "AttributeInitializationDefinition",
-                find_object("AttributeInitializationDefinition", gear_source.loot_variance),
+                find_object_cached("AttributeInitializationDefinition", gear_source.loot_variance),
             )
         else:
             game_stage_variance = None
-        qualifying_items: list[WillowShield | WillowWeapon] = []
+        pools = [
+            cast("ItemPoolDefinition", find_object_cached("ItemPoolDefinition", pool_str))
+            for pool_str in gear_source.item_pools
+        ]
+        max_attempts = int(gear_farm_attempts.value) if gear_source.farm else 1
+        deadline = time.perf_counter() + gear_farm_budget.value / 1000
+
+        report = FarmReport(gear_source.map_name)
+        best_score = float("-inf")
+        start = time.perf_counter()
+        while report.attempts < max_attempts:
+            report.attempts += 1
+            items: list[WillowShield | WillowWeapon] = []
+            for pool in pools:
+                items.extend(self.get_items_from_pool(pool, gear_source.gear_lvl, game_stage_variance))
+            report.spawned += len(items)
+
+            qualifying_items = [item for item in items if gear_source.qualifying_func(item)]
+            if qualifying_items:
+                report.best = max(qualifying_items, key=gear_source.sort_func)
+                report.qualified = True
+                break
+            for item in items:
+                score = gear_source.sort_func(item)
+                if score > best_score:
+                    report.best, best_score = item, score
+            if time.perf_counter() > deadline:
+                break
+        report.seconds = time.perf_counter() - start
 
-        for pool_str in gear_source.item_pools:
-            pool = cast("ItemPoolDefinition", find_object("ItemPoolDefinition", pool_str))
-            qualifying_items.extend(
-                self.get_items_from_pool(pool, gear_source.gear_lvl, game_stage_variance),
-            )
-        qualifying_items = [item for item in qualifying_items if gear_source.qualifying_func(item)]
-        if len(qualifying_items) > 0:
-            return max(qualifying_items, key=gear_source.sort_func)
         if gear_source.farm:
-            return self.spawn_from_gear_source(gear_source)
-        return None
+            print(report)
+        else:
+            logging.misc(str(report))
+        if not gear_source.farm and not report.qualified:
+            return None
+        return report.best
 
     def is_lascaux(self, weapon: WillowWeapon) -> bool:
         """Determines if the provided weapon is a Lascaux."""
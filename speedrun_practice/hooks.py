@@ -5,11 +5,15 @@ from typing import TYPE_CHECKING, Any
 from mods_base import hook
 from unrealsdk.hooks import Block
 
+from speedrun_practice.checkpoints import forget_host_manager, forget_host_managers_on_map_change
+from speedrun_practice.host_queue import forget_client
+from speedrun_practice.object_cache import invalidate_on_map_change
 from speedrun_practice.reloader import register_module
+from speedrun_practice.state_sync import forget_client_link
 from speedrun_practice.utilities import get_pc
 
 if TYPE_CHECKING:
-    from bl2 import Actor
+    from bl2 import Actor, GameInfo
     from mods_base.hook import HookType, PreHookRet
 
 
@@ -38,6 +42,27 @@ def block_achievements(*_: Any) -> PreHookRet:
     return Block
 
 
-hooks: list[HookType] = [set_catapult_priority, block_achievements]
+@hook("Engine.GameInfo:Logout")  # type: ignore
+def forget_departed_player(
+    _1: Any,
+    args: GameInfo.Logout.args,
+    *_: Any,
+) -> None:
+    """Drop everything the host keeps per player once they leave, rather than at the next map change."""
+    pri = args.Exiting.PlayerReplicationInfo
+    if not pri:
+        return
+    forget_host_manager(pri.PlayerID)
+    forget_client_link(pri.PlayerID)
+    forget_client(pri.PlayerID)
+
+
+hooks: list[HookType] = [
+    set_catapult_priority,
+    block_achievements,
+    invalidate_on_map_change,
+    forget_host_managers_on_map_change,
+    forget_departed_player,
+]
 
 register_module(__name__)
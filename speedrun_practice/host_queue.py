@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from mods_base import hook
+from unrealsdk.hooks import Type
+
+from speedrun_practice.reloader import register_module
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Hashable
+
+    from bl2 import WillowPlayerReplicationInfo
+
+_TICK_BUDGET = 0.004  # Seconds of host requests run per tick. At least one always runs.
+
+
+@dataclass
+class HostRequest:
+    pri: WillowPlayerReplicationInfo
+    kind: Hashable  # Requests of the same kind from the same client supersede each other
+    run: Callable[[], None]
+    queued_at: float = field(default_factory=time.perf_counter)
+
+
+@dataclass
+class ClientQueueStats:
+    name: str
+    requests: int = 0
+    collapsed: int = 0
+    max_depth: int = 0
+    total_wait: float = 0
+    max_wait: float = 0
+
+    def __str__(self) -> str:
+        avg_wait = self.total_wait / self.requests if self.requests else 0
+        return (
+            f"{self.name}: {self.requests} requests, {self.collapsed} collapsed, max queue depth "
+            f"{self.max_depth}, wait {avg_wait * 1000:.1f}ms avg / {self.max_wait * 1000:.1f}ms max"
+        )
+
+
+_queues: OrderedDict[int, deque[HostRequest]] = OrderedDict()  # Keyed by PlayerID, in round robin order
+client_stats: dict[int, ClientQueueStats] = {}
+
+
+def queue_host_request(
+    pri: WillowPlayerReplicationInfo,
+    run: Callable[[], None],
+    kind: Hashable | None = None,
+) -> None:
+    """
+    Queue work for a client request to run on an upcoming tick.
+
+    If kind is given, a request of the same kind from the same client that hasn't run yet is
+    dropped, since this one replaces it anyway.
+    """
+    player_id = pri.PlayerID
+    queue = _queues.setdefault(player_id, deque())
+    stats = client_stats.setdefault(player_id, ClientQueueStats(pri.PlayerName))
+    if kind is not None:
+        for pending in queue:
+            if pending.kind == kind:
+                queue.remove(pending)
+                stats.collapsed += 1
+                break
+    queue.append(HostRequest(pri, kind, run))
+    stats.max_depth = max(stats.max_depth, len(queue))
+    drain_host_requests.enable()
+
+
+@hook("WillowGame.WillowGameViewportClient:Tick", Type.POST)
+def drain_host_requests(*_: Any) -> None:
+    """Run queued requests, one client at a time in turn, until this tick's budget is used."""
+    start = time.perf_counter()
+    while _queues:
+        player_id, queue = next(iter(_queues.items()))
+        request = queue.popleft()
+        if queue:
+            _queues.move_to_end(player_id)  # Back of the line for this client's next request
+        else:
+            del _queues[player_id]
+
+        stats = client_stats[player_id]
+        wait = time.perf_counter() - request.queued_at
+        stats.requests += 1
+        stats.total_wait += wait
+        stats.max_wait = max(stats.max_wait, wait)
+        if request.pri.Owner:  # Player may have left since
+            request.run()
+
+        if time.perf_counter() - start > _TICK_BUDGET:
+            break
+
+    if not _queues:
+        drain_host_requests.disable()
+
+
+def forget_client(player_id: int) -> None:
+    """Drop a client who left, along with any of their requests that haven't run yet."""
+    _queues.pop(player_id, None)
+    client_stats.pop(player_id, None)
+
+
+def summary() -> str:
+    """Queue stats per client, for printing to console."""
+    if not client_stats:
+        return "No host requests queued yet"
+    return "Host request queue:\n" + "\n".join(f"  {stats}" for stats in client_stats.values())
+
+
+register_module(__name__)
@@ -1,25 +1,28 @@
 from __future__ import annotations
 
 from collections.abc import Callable
-from dataclasses import asdict
 from typing import TYPE_CHECKING, cast
 
 from mods_base import KeybindType, keybind
-from unrealsdk import find_all, find_enum, make_struct
+from unrealsdk import find_enum, logging, make_struct
 from unrealsdk.hooks import Block
 
-from speedrun_practice.checkpoints import CheckpointSaver
+from speedrun_practice.catalog import find_checkpoints
+from speedrun_practice.checkpoints import CheckpointSaver, get_current_game_state
 from speedrun_practice.gear import GearRandomizer
 from speedrun_practice.network_funcs import (
+    HostRequestBatch,
     request_game_state,
     request_load_checkpoint,
     request_save_checkpoint,
     request_set_designer_attribute_value,
     request_set_skill_stacks,
-    request_trigger_kill_skills,
+    request_snapshot,
+    start_party_load,
 )
 from speedrun_practice.options import incite, kill_skills, locked_and_loaded
 from speedrun_practice.reloader import register_module
+from speedrun_practice.snapshots import snapshot_ring
 from speedrun_practice.text_input import TextInputBoxSRP
 from speedrun_practice.utilities import (
     RunCategory,
@@ -28,12 +31,15 @@ from speedrun_practice.utilities import (
     restore_commander_position,
     try_parse_int,
 )
+from speedrun_practice.weapon_slots import reset_weapon_slots
 
 type KeybindBlockSignal = None | Block | type[Block]
 type KeybindCallback_NoArgs = Callable[[], KeybindBlockSignal]
 
 if TYPE_CHECKING:
-    from bl2 import AmmoResourcePool, Inventory, Object, WillowDeclarations, WillowWeapon
+    from bl2 import Object, WillowDeclarations, WillowWeapon
+
+    from speedrun_practice.snapshots import Snapshot
 
     make_struct_vector = Object.Vector.make_struct
     find_enum_quick_weapon_slot = WillowDeclarations.EQuickWeaponSlot.find_enum
@@ -154,15 +160,6 @@ def reset_gunzerk_and_weapons_kb() -> None:  # noqa: D103
 def reset_gunzerk_and_weapons() -> None:
     """Reset gunzerk, weapon drop order, and ammo."""
     pc = get_pc()
-    ammo_pools = cast(list["AmmoResourcePool"], find_all("AmmoResourcePool"))
-    for pool in ammo_pools:
-        if pool.Definition and pool.Definition.Resource.ResourceName == "Rockets":
-            pool.SetCurrentValue(pool.GetMaxValue())
-
-    def _drop_pickup_weapon(weapon: Inventory) -> None:
-        inventory_manager.RemoveFromInventory(weapon)
-        inventory_manager.AddInventory(weapon, True)
-
     inventory_manager = pc.GetPawnInventoryManager()
     weapons = cast(
         list["WillowWeapon"],
@@ -170,16 +167,15 @@ def reset_gunzerk_and_weapons() -> None:
     )
     weapons_by_slot = {int(weapon.QuickSelectSlot): weapon for weapon in weapons if weapon}
 
+    # The player's own pools, rather than every AmmoResourcePool in the object table
+    pool_manager = pc.ResourcePoolManager
+    for pool in pool_manager.ResourcePools if pool_manager else []:
+        if pool and pool.Definition and pool.Definition.Resource.ResourceName == "Rockets":
+            pool.SetCurrentValue(pool.GetMaxValue())
+
     # Canceling gunzerk like this because using a func directly crashes the game sometimes
-    for slot in [1, 2, 3, 4]:  # Cancel gunzerk
-        if weapons_by_slot.get(slot):
-            inventory_manager.RemoveFromInventory(weapons_by_slot[slot])
-    for slot in [1, 2, 3, 4]:  # Add weapons back in
-        if weapons_by_slot.get(slot):
-            inventory_manager.AddInventory(weapons_by_slot[slot], False)
-    for slot in [3, 4, 1, 2]:
-        if weapons_by_slot.get(slot):
-            _drop_pickup_weapon(weapons_by_slot[slot])
+    inventory_calls = reset_weapon_slots(inventory_manager, weapons_by_slot)
+    logging.misc(f"Gunzerk reset took {inventory_calls} inventory calls")
 
     e_quick_weapon_slot = find_enum_quick_weapon_slot("EQuickWeaponSlot")
     pc.EquipWeaponFromSlot(e_quick_weapon_slot.QuickSelectLeft)
@@ -192,12 +188,14 @@ def reset_to_position_and_trigger_skills() -> None:  # noqa: D103
     reset_gunzerk_and_weapons()
     restore_commander_position()
     pc.Pawn.Velocity = make_struct_vector("Vector", X=0, Y=0, Z=0)
+    batch = HostRequestBatch()
     if incite.value:
-        request_set_skill_stacks(1, "GD_Mercenary_Skills.Brawn.Incite_Active")
+        batch.set_skill_stacks(1, "GD_Mercenary_Skills.Brawn.Incite_Active")
     if locked_and_loaded.value:
-        request_set_skill_stacks(1, "GD_Mercenary_Skills.Gun_Lust.LockedAndLoaded_Active")
+        batch.set_skill_stacks(1, "GD_Mercenary_Skills.Gun_Lust.LockedAndLoaded_Active")
     if kill_skills.value:
-        request_trigger_kill_skills()
+        batch.trigger_kill_skills()
+    batch.send()
 
 
 @keybind("Log Current Stats")
@@ -227,9 +225,58 @@ def overwrite_save() -> None:  # noqa: D103
 def load_checkpoint() -> None:  # noqa: D103
     from speedrun_practice.options import save_game_path
 
-    saver = CheckpointSaver(None, save_game_path.value)
-    state_to_load = saver.get_player_stats()
-    request_load_checkpoint(asdict(state_to_load))
+    state_to_load = get_current_game_state(save_game_path.value)
+    request_load_checkpoint(state_to_load)
+
+
+@keybind("Load Checkpoint State for Party")
+def load_party_checkpoint() -> None:
+    """Load every player's own checkpoint state together on the host."""
+    start_party_load(False)
+
+
+@keybind("Find Checkpoint")
+def find_checkpoint() -> None:
+    """Search checkpoints from a text input box, results are printed to console for srp_load."""
+    input_box = TextInputBoxSRP("Search Checkpoints")
+
+    def on_submit(msg: str) -> None:
+        results = find_checkpoints(msg)
+        if results:
+            feedback(get_pc().PlayerReplicationInfo, f"Top result: {results[0].summary()}")
+
+    input_box.on_submit = on_submit
+    input_box.show()
+
+
+@keybind("Take Snapshot")
+def take_snapshot() -> None:  # noqa: D103
+    request_snapshot(True)
+
+
+def _restore_snapshot(slot: tuple[int, Snapshot] | None) -> None:
+    pc = get_pc()
+    if slot is None:
+        feedback(pc.PlayerReplicationInfo, "No snapshots taken yet")
+        return
+    slot_id, snapshot = slot
+    if snapshot.map_name != pc.WorldInfo.GetMapName(True):
+        feedback(pc.PlayerReplicationInfo, f"Snapshot {slot_id} was taken on {snapshot.map_name}")
+        return
+    snapshot_ring.mark_used(slot_id)
+    request_load_checkpoint(snapshot.game_state)
+
+
+@keybind("Restore Snapshot")
+def restore_snapshot() -> None:
+    """Restore the most recently taken or restored snapshot."""
+    _restore_snapshot(snapshot_ring.current())
+
+
+@keybind("Restore Previous Snapshot")
+def restore_previous_snapshot() -> None:
+    """Step back to the next older snapshot and restore it."""
+    _restore_snapshot(snapshot_ring.cycle())
 
 
 @keybind("Move Current Save to Top")
@@ -255,6 +302,11 @@ all_keybinds = [
     save_checkpoint,
     overwrite_save,
     load_checkpoint,
+    load_party_checkpoint,
+    find_checkpoint,
+    take_snapshot,
+    restore_snapshot,
+    restore_previous_snapshot,
     touch_file,
     log_current_state,
 ]
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict, defaultdict, deque
+from dataclasses import dataclass, field
+from typing import Any
+
+from unrealsdk import logging
+
+from speedrun_practice.reloader import register_module
+
+_MAX_SAMPLES = 500  # Per histogram, older samples are dropped
+_MAX_PENDING = 64  # Requests that never got a response, e.g. superseded on the host, are forgotten
+
+
+@dataclass
+class PayloadStats:
+    messages: int = 0
+    full_states: int = 0
+    bytes_sent: int = 0
+    bytes_if_full: int = 0  # What sending every field by name would have cost
+
+    def __str__(self) -> str:
+        saved = 1 - self.bytes_sent / self.bytes_if_full if self.bytes_if_full else 0
+        return (
+            f"{self.messages} messages ({self.full_states} full), {self.bytes_sent} bytes sent, "
+            f"{self.bytes_if_full} bytes as full states ({saved:.0%} saved)"
+        )
+
+
+@dataclass
+class WireStats:
+    messages: int = 0
+    wire_bytes: int = 0
+    json_bytes: int = 0  # What the same messages would have cost as JSON
+
+    def __str__(self) -> str:
+        saved = 1 - self.wire_bytes / self.json_bytes if self.json_bytes else 0
+        return (
+            f"{self.messages} messages, {self.wire_bytes} bytes on the wire, "
+            f"{self.json_bytes} bytes as JSON ({saved:.0%} saved)"
+        )
+
+
+payloads: defaultdict[str, PayloadStats] = defaultdict(PayloadStats)
+wire: defaultdict[str, WireStats] = defaultdict(WireStats)
+
+
+def record_payload(message: str, nbytes: int, full_nbytes: int, full: bool) -> None:
+    """Record the size of a game state payload we sent."""
+    stats = payloads[message]
+    stats.messages += 1
+    stats.full_states += full
+    stats.bytes_sent += nbytes
+    stats.bytes_if_full += full_nbytes
+    logging.misc(f"{message}: {nbytes} byte game state ({'full' if full else 'delta'}, {full_nbytes} as full state)")
+
+
+def record_wire(message: str, nbytes: int, json_nbytes: int) -> None:
+    """Record the encoded size of a whole network message we sent."""
+    stats = wire[message]
+    stats.messages += 1
+    stats.wire_bytes += nbytes
+    stats.json_bytes += json_nbytes
+    logging.misc(f"{message}: {nbytes} bytes on the wire ({json_nbytes} as JSON)")
+
+
+@dataclass
+class LatencyHistogram:
+    samples: deque[float] = field(default_factory=lambda: deque(maxlen=_MAX_SAMPLES))
+
+    def percentile(self, pct: float) -> float:
+        """Nearest rank percentile of the kept samples, in seconds."""
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))] if ordered else 0
+
+    def __str__(self) -> str:
+        pcts = ", ".join(f"p{pct} {self.percentile(pct) * 1000:.1f}" for pct in (50, 90, 99))
+        return f"n={len(self.samples)}, {pcts}, max {max(self.samples, default=0) * 1000:.1f} (ms)"
+
+
+# Keyed by (request kind, phase). Phases are rtt, then the parts it's made of: queue and host time on
+# the host, network for everything else on the way there and back. Client is time spent handling
+# the response, like writing the save, after the round trip ends.
+latencies: defaultdict[tuple[str, str], LatencyHistogram] = defaultdict(LatencyHistogram)
+_pending: OrderedDict[int, tuple[str, float]] = OrderedDict()
+_next_request_id = 0
+
+
+def start_request(kind: str) -> int:
+    """Stamp an outgoing request, returning the id the host should send back with its timing."""
+    global _next_request_id
+    request_id = _next_request_id
+    _next_request_id += 1
+    _pending[request_id] = (kind, time.perf_counter())
+    while len(_pending) > _MAX_PENDING:
+        _pending.popitem(last=False)
+    return request_id
+
+
+class HostTiming:
+    """Host side timing of one request, from the message arriving to the response being sent."""
+
+    def __init__(self, request: dict[str, Any]) -> None:
+        self.request_id: int = request.get("rid", -1)
+        self.received = time.perf_counter()
+        self.started = self.received
+
+    def start(self) -> None:
+        """Call when the request leaves the queue and work begins."""
+        self.started = time.perf_counter()
+
+    def stamp(self) -> dict[str, Any]:
+        """Timing to send back with the response."""
+        return {"rid": self.request_id, "wait": self.started - self.received, "host": time.perf_counter() - self.started}
+
+
+def finish_request(timing: dict[str, Any] | None) -> str | None:
+    """Record timings for a response, returning the request kind if it matched one of our requests."""
+    if not timing or timing["rid"] not in _pending:
+        return None
+    kind, sent_at = _pending.pop(timing["rid"])
+    rtt = time.perf_counter() - sent_at
+    latencies[kind, "rtt"].samples.append(rtt)
+    latencies[kind, "queue"].samples.append(timing["wait"])
+    latencies[kind, "host"].samples.append(timing["host"])
+    latencies[kind, "network"].samples.append(max(rtt - timing["wait"] - timing["host"], 0))
+    return kind
+
+
+def record_latency(kind: str, phase: str, seconds: float) -> None:  # noqa: D103
+    latencies[kind, phase].samples.append(seconds)
+
+
+def summary() -> str:
+    """Network stats for every message we've sent, for printing to console."""
+    lines: list[str] = []
+    if payloads:
+        lines.append("Game state payloads:")
+        lines.extend(f"  {message}: {stats}" for message, stats in sorted(payloads.items()))
+    if wire:
+        lines.append("Encoded messages:")
+        lines.extend(f"  {message}: {stats}" for message, stats in sorted(wire.items()))
+    if latencies:
+        lines.append("Latency:")
+        lines.extend(f"  {kind} {phase}: {hist}" for (kind, phase), hist in sorted(latencies.items()))
+    return "\n".join(lines) if lines else "No game states sent yet"
+
+
+def reset() -> None:  # noqa: D103
+    payloads.clear()
+    wire.clear()
+    latencies.clear()
+    _pending.clear()
+
+
+register_module(__name__)
@@ -1,32 +1,50 @@
 from __future__ import annotations
 
-from dataclasses import asdict
+import time
+from dataclasses import dataclass, field, replace
 from typing import TYPE_CHECKING, Any, cast
 
+from mods_base import hook
 from networking import host, targeted
+from unrealsdk.hooks import Type
 
-from speedrun_practice.checkpoints import CheckpointSaver, HostGameStateManager
-from speedrun_practice.game_state import GameState
+from speedrun_practice import net_stats
+from speedrun_practice.checkpoints import (
+    CheckpointSaver,
+    HostGameStateManager,
+    get_current_game_state,
+    get_host_game_state_manager,
+    get_host_skill_manager,
+)
+from speedrun_practice.host_queue import queue_host_request
 from speedrun_practice.options import save_game_path
 from speedrun_practice.reloader import register_module
-from speedrun_practice.skills import HostSkillManager
+from speedrun_practice.snapshots import set_auto_snapshot_request, store_snapshot
+from speedrun_practice.state_sync import client_link, host_link
 from speedrun_practice.utilities import feedback, get_pc
+from speedrun_practice.wire import decode_message, pack
 
 if TYPE_CHECKING:
     from bl2 import WillowPlayerReplicationInfo
 
+    from speedrun_practice.game_state import GameState
 
-@targeted.json_message
-def client_save_checkpoint(
-    save_name: str,
-    overwrite: bool,
-    game_state_dict: dict[str, Any],
-) -> None:
+
+@targeted.string_message
+def client_save_checkpoint(data: str) -> None:
     """Send message to client to trigger save of game state info."""
-    game_state = GameState(**game_state_dict)
+    payload = decode_message(data)
+    save_name: str = payload["save_name"]
+    kind = net_stats.finish_request(payload.get("t"))
+    game_state = host_link().decode(payload)
+    if game_state is None:
+        return
+    start = time.perf_counter()
     save_dir: str = save_game_path.value
     saver = CheckpointSaver(save_name, save_dir, game_state)
-    saver.save_checkpoint(overwrite)
+    saver.save_checkpoint(payload["overwrite"])
+    if kind:
+        net_stats.record_latency(kind, "client", time.perf_counter() - start)
     feedback(
         get_pc().PlayerReplicationInfo,
         f"Saved checkpoint with name {save_name}. See console for details",
@@ -34,70 +52,394 @@ def client_save_checkpoint(
     print(game_state)
 
 
-@host.json_message
 def request_save_checkpoint(save_name: str, overwrite: bool) -> None:
     """Request a checkpoint save from host."""
-    sender_pri = cast("WillowPlayerReplicationInfo", request_save_checkpoint.sender)
-    host_game_state_manager = HostGameStateManager(sender_pri)
-    game_state = host_game_state_manager.get_game_state()
-    client_save_checkpoint(sender_pri, save_name, overwrite, asdict(game_state))
+    request = {
+        **host_link().header(),
+        "rid": net_stats.start_request("save_checkpoint"),
+        "save_name": save_name,
+        "overwrite": overwrite,
+    }
+    host_save_checkpoint(pack("host_save_checkpoint", request))
+
+
+@host.string_message
+def host_save_checkpoint(data: str) -> None:
+    """Get the sender's game state and send it back for a checkpoint save."""
+    sync = decode_message(data)
+    sender_pri = cast("WillowPlayerReplicationInfo", host_save_checkpoint.sender)
+    client_link(sender_pri).read_header(sync)
+    timing = net_stats.HostTiming(sync)
+
+    def run() -> None:
+        timing.start()
+        game_state = get_host_game_state_manager(sender_pri).get_game_state()
+        payload = client_link(sender_pri).encode(game_state, "client_save_checkpoint")
+        response = {**payload, "t": timing.stamp(), "save_name": sync["save_name"], "overwrite": sync["overwrite"]}
+        client_save_checkpoint(sender_pri, pack("client_save_checkpoint", response))
 
+    queue_host_request(sender_pri, run)
 
-@host.json_message
-def request_load_checkpoint(game_state_dict: dict[str, Any]) -> None:
+
+def request_load_checkpoint(game_state: GameState) -> None:
     """Request a load checkpoint from host."""
-    sender_pri = cast("WillowPlayerReplicationInfo", request_load_checkpoint.sender)
-    game_state = GameState(**game_state_dict)
-    host_game_state_manager = HostGameStateManager(sender_pri)
-    host_game_state_manager.load_game_state(game_state)
+    payload = host_link().encode(game_state, "request_load_checkpoint")
+    payload["rid"] = net_stats.start_request("load_checkpoint")
+    host_load_checkpoint(pack("host_load_checkpoint", payload))
+
+
+@host.string_message
+def host_load_checkpoint(data: str) -> None:
+    """Load a game state for the sender and send back what was loaded."""
+    payload = decode_message(data)
+    sender_pri = cast("WillowPlayerReplicationInfo", host_load_checkpoint.sender)
+    timing = net_stats.HostTiming(payload)
+    # Decoded right away, the link has to see every payload in order even if the load gets superseded
+    game_state = decode_checkpoint_payload(sender_pri, payload)
+    if game_state is None:
+        return
+
+    def run() -> None:
+        timing.start()
+        apply_checkpoint(get_host_game_state_manager(sender_pri), game_state, timing)
+
+    queue_host_request(sender_pri, run, kind="load_checkpoint")
+
+
+def decode_checkpoint_payload(sender_pri: WillowPlayerReplicationInfo, payload: dict[str, Any]) -> GameState | None:
+    """Host side decode of a checkpoint load request."""
+    game_state = client_link(sender_pri).decode(payload)
+    if game_state is None:
+        feedback(sender_pri, "Checkpoint state got out of sync with host, try loading again")
+    return game_state
+
+
+def apply_checkpoint(
+    host_game_state_manager: HostGameStateManager,
+    game_state: GameState,
+    timing: net_stats.HostTiming | None = None,
+) -> None:
+    """Host side of loading a checkpoint, shared by single and batched requests."""
+    sender_pri = host_game_state_manager.target_pri
+    feedback(sender_pri, host_game_state_manager.load_game_state(game_state))
     game_state.crit = round(
         host_game_state_manager.target_pc.CurrentInstantHitCriticalHitBonus,
         2,
     )  # For info only
-    client_log_game_state(sender_pri, asdict(game_state))
+    payload = client_link(sender_pri).encode(game_state, "client_log_game_state")
+    if timing is not None:
+        payload["t"] = timing.stamp()
+    client_log_game_state(sender_pri, pack("client_log_game_state", payload))
 
 
-@targeted.json_message
-def client_log_game_state(game_state_dict: dict[str, Any]) -> None:
+@targeted.string_message
+def client_log_game_state(data: str) -> None:
     """Request client log game state."""
-    game_state = GameState(**game_state_dict)
-    print(game_state)
+    payload = decode_message(data)
+    net_stats.finish_request(payload.get("t"))
+    game_state = host_link().decode(payload)
+    if game_state is not None:
+        print(game_state)
 
 
-@host.message
 def request_game_state() -> None:
     """Request host send back a game state for logging to console."""
-    sender_pri = cast("WillowPlayerReplicationInfo", request_game_state.sender)
-    host_game_state_manager = HostGameStateManager(sender_pri)
-    game_state = host_game_state_manager.get_game_state()
-    client_log_game_state(sender_pri, asdict(game_state))
+    request = {**host_link().header(), "rid": net_stats.start_request("game_state")}
+    host_get_game_state(pack("host_get_game_state", request))
+
+
+@host.string_message
+def host_get_game_state(data: str) -> None:
+    """Send the sender's game state back for logging to console."""
+    sync = decode_message(data)
+    sender_pri = cast("WillowPlayerReplicationInfo", host_get_game_state.sender)
+    client_link(sender_pri).read_header(sync)
+    timing = net_stats.HostTiming(sync)
+
+    def run() -> None:
+        timing.start()
+        game_state = get_host_game_state_manager(sender_pri).get_game_state()
+        payload = client_link(sender_pri).encode(game_state, "client_log_game_state")
+        client_log_game_state(sender_pri, pack("client_log_game_state", {**payload, "t": timing.stamp()}))
+
+    queue_host_request(sender_pri, run, kind="get_game_state")
+
+
+def request_snapshot(announce: bool) -> None:
+    """Request host send back the current game state for an in-memory snapshot."""
+    request = {**host_link().header(), "rid": net_stats.start_request("snapshot"), "announce": announce}
+    host_take_snapshot(pack("host_take_snapshot", request))
+
+
+set_auto_snapshot_request(lambda: request_snapshot(False))
+
+
+@host.string_message
+def host_take_snapshot(data: str) -> None:
+    """Send the sender's game state back for an in-memory snapshot."""
+    sync = decode_message(data)
+    sender_pri = cast("WillowPlayerReplicationInfo", host_take_snapshot.sender)
+    client_link(sender_pri).read_header(sync)
+    timing = net_stats.HostTiming(sync)
+
+    def run() -> None:
+        timing.start()
+        game_state = get_host_game_state_manager(sender_pri).get_game_state()
+        payload = client_link(sender_pri).encode(game_state, "client_store_snapshot")
+        response = {**payload, "t": timing.stamp(), "announce": sync["announce"]}
+        client_store_snapshot(sender_pri, pack("client_store_snapshot", response))
+
+    queue_host_request(sender_pri, run, kind="snapshot")
+
+
+@targeted.string_message
+def client_store_snapshot(data: str) -> None:
+    """Store a game state from the host in the snapshot ring."""
+    payload = decode_message(data)
+    net_stats.finish_request(payload.get("t"))
+    game_state = host_link().decode(payload)
+    if game_state is None:
+        return
+    slot_id = store_snapshot(game_state)
+    if payload["announce"]:
+        feedback(get_pc().PlayerReplicationInfo, f"Snapshot {slot_id} taken")
 
 
-@host.json_message
 def request_set_skill_stacks(target_stacks: int, skill_path: str) -> None:
     """Request host set skill stacks to a given value."""
-    host_skill_manager = HostSkillManager(
-        sender_pri=cast("WillowPlayerReplicationInfo", request_set_skill_stacks.sender),
+    host_set_skill_stacks(pack("host_set_skill_stacks", {"stacks": target_stacks, "path": skill_path}))
+
+
+@host.string_message
+def host_set_skill_stacks(data: str) -> None:
+    """Set skill stacks for the sender."""
+    payload = decode_message(data)
+    target_stacks: int = payload["stacks"]
+    skill_path: str = payload["path"]
+    sender_pri = cast("WillowPlayerReplicationInfo", host_set_skill_stacks.sender)
+    queue_host_request(
+        sender_pri,
+        lambda: get_host_skill_manager(sender_pri).set_skill_stacks(target_stacks, skill_path),
+        kind=("set_skill_stacks", skill_path),
     )
-    host_skill_manager.set_skill_stacks(target_stacks, skill_path)
 
 
-@host.json_message
 def request_set_designer_attribute_value(target_stacks: int, skill_path: str) -> None:
     """Request host set designer attribute value for player."""
-    host_skill_manager = HostSkillManager(
-        sender_pri=cast("WillowPlayerReplicationInfo", request_set_designer_attribute_value.sender),
+    request = {"stacks": target_stacks, "path": skill_path}
+    host_set_designer_attribute_value(pack("host_set_designer_attribute_value", request))
+
+
+@host.string_message
+def host_set_designer_attribute_value(data: str) -> None:
+    """Set a designer attribute value for the sender."""
+    payload = decode_message(data)
+    target_stacks: int = payload["stacks"]
+    skill_path: str = payload["path"]
+    sender_pri = cast("WillowPlayerReplicationInfo", host_set_designer_attribute_value.sender)
+    queue_host_request(
+        sender_pri,
+        lambda: get_host_skill_manager(sender_pri).set_designer_attribute_value(target_stacks, skill_path),
+        kind=("set_designer_attribute_value", skill_path),
     )
-    host_skill_manager.set_designer_attribute_value(target_stacks, skill_path)
 
 
 @host.message
 def request_trigger_kill_skills() -> None:
     """Request host trigger kill skills for player."""
-    host_skill_manager = HostSkillManager(
-        sender_pri=cast("WillowPlayerReplicationInfo", request_trigger_kill_skills.sender),
-    )
-    host_skill_manager.trigger_kill_skills()
+    sender_pri = cast("WillowPlayerReplicationInfo", request_trigger_kill_skills.sender)
+    queue_host_request(sender_pri, lambda: get_host_skill_manager(sender_pri).trigger_kill_skills())
+
+
+# Ops a HostRequestBatch can hold, ids are positions. Only ever append to this.
+BATCH_OPS = ("set_skill_stacks", "set_designer_attribute_value", "trigger_kill_skills", "load_checkpoint")
+_BATCH_OP_IDS = {op: i for i, op in enumerate(BATCH_OPS)}
+
+
+class HostRequestBatch:
+    """
+    Several host requests sent as one network message.
+
+    The host applies them in order within the same tick, sharing one game state manager, so
+    composite actions don't pay for a message and manager setup per request. Each op is sent as
+    [op id, arguments], the arguments being a message of their own.
+    """
+
+    def __init__(self) -> None:
+        self.ops: list[list[Any]] = []
+
+    def _add(self, op: str, args: dict[str, Any]) -> HostRequestBatch:
+        self.ops.append([_BATCH_OP_IDS[op], args])
+        return self
+
+    def set_skill_stacks(self, target_stacks: int, skill_path: str) -> HostRequestBatch:  # noqa: D102
+        return self._add("set_skill_stacks", {"stacks": target_stacks, "path": skill_path})
+
+    def set_designer_attribute_value(self, target_value: int, designer_attr_str: str) -> HostRequestBatch:  # noqa: D102
+        return self._add("set_designer_attribute_value", {"stacks": target_value, "path": designer_attr_str})
+
+    def trigger_kill_skills(self) -> HostRequestBatch:  # noqa: D102
+        return self._add("trigger_kill_skills", {})
+
+    def load_checkpoint(self, game_state: GameState) -> HostRequestBatch:  # noqa: D102
+        return self._add("load_checkpoint", host_link().encode(game_state, "host_request_batch"))
+
+    def send(self) -> None:
+        """Send all requests to the host, nothing is sent for an empty batch."""
+        if self.ops:
+            host_request_batch(pack("host_request_batch", {"ops": self.ops}))
+            self.ops = []
+
+
+@host.string_message
+def host_request_batch(data: str) -> None:
+    """Apply a batch of requests for the sender, in order."""
+    sender_pri = cast("WillowPlayerReplicationInfo", host_request_batch.sender)
+    ops: list[tuple[str, Any]] = []
+    for op_id, args in decode_message(data)["ops"]:
+        if op_id >= len(BATCH_OPS):
+            print(f"Unknown host request {op_id}, is the host running the same mod version?")
+            continue
+        op = BATCH_OPS[op_id]
+        # Decoded right away, the link has to see every payload in the order it arrived
+        ops.append((op, decode_checkpoint_payload(sender_pri, args) if op == "load_checkpoint" else args))
+
+    def run() -> None:
+        host_game_state_manager = get_host_game_state_manager(sender_pri)
+        host_skill_manager = host_game_state_manager.host_skill_manager
+        for op, args in ops:
+            if op == "load_checkpoint":
+                if args is not None:
+                    apply_checkpoint(host_game_state_manager, args)
+            elif op == "set_skill_stacks":
+                host_skill_manager.set_skill_stacks(args["stacks"], args["path"])
+            elif op == "set_designer_attribute_value":
+                host_skill_manager.set_designer_attribute_value(args["stacks"], args["path"])
+            elif op == "trigger_kill_skills":
+                host_skill_manager.trigger_kill_skills()
+
+    queue_host_request(sender_pri, run)
+
+
+@dataclass
+class PartyLoad:
+    """A party wide checkpoint load on the host, waiting for every player's saved state."""
+
+    load_id: int
+    players: dict[int, WillowPlayerReplicationInfo]  # Keyed by PlayerID
+    states: dict[int, GameState] = field(default_factory=dict)
+    started_at: float = field(default_factory=time.perf_counter)
+
+    @property
+    def complete(self) -> bool:  # noqa: D102
+        return self.states.keys() >= self.players.keys()
+
+
+_PARTY_LOAD_TIMEOUT = 3.0  # Seconds to wait for clients to send their states before loading without them
+_party_load: PartyLoad | None = None
+_next_party_load_id = 0
+
+
+def start_party_load(shared: bool) -> None:
+    """
+    Load checkpoint states for everyone in the party at once. Host only.
+
+    With shared, the host's current save state is loaded for every player. Otherwise each client is
+    asked for the state in their own current save, and all states are loaded together once every
+    client has answered, or the timeout passes.
+    """
+    global _party_load, _next_party_load_id
+    pc = get_pc()
+    host_pri = cast("WillowPlayerReplicationInfo", pc.PlayerReplicationInfo)
+    if not host_pri.bIsPartyLeader:
+        feedback(host_pri, "Only the host can load checkpoints for the whole party")
+        return
+
+    players = {
+        pri.PlayerID: cast("WillowPlayerReplicationInfo", pri)
+        for pri in pc.WorldInfo.GRI.PRIArray
+        if pri and pri.Owner
+    }
+    host_state = get_current_game_state(save_game_path.value)
+    _next_party_load_id += 1
+    _party_load = PartyLoad(_next_party_load_id, players)
+    if shared:
+        _party_load.states = dict.fromkeys(players, host_state)
+    else:
+        _party_load.states[host_pri.PlayerID] = host_state
+        for player_id, pri in players.items():
+            if player_id != host_pri.PlayerID:
+                request = {**client_link(pri).header(), "load_id": _party_load.load_id}
+                client_send_party_state(pri, pack("client_send_party_state", request))
+    wait_for_party_states.enable()
+
+
+@targeted.string_message
+def client_send_party_state(data: str) -> None:
+    """Send the state in our current save to the host for a party load."""
+    sync = decode_message(data)
+    host_link().read_header(sync)
+    game_state = get_current_game_state(save_game_path.value)
+    payload = {**host_link().encode(game_state, "host_party_state"), "load_id": sync["load_id"]}
+    host_party_state(pack("host_party_state", payload))
+
+
+@host.string_message
+def host_party_state(data: str) -> None:
+    """Collect a client's state for a party load."""
+    payload = decode_message(data)
+    sender_pri = cast("WillowPlayerReplicationInfo", host_party_state.sender)
+    game_state = decode_checkpoint_payload(sender_pri, payload)
+    if _party_load is None or _party_load.load_id != payload["load_id"] or game_state is None:
+        return
+    _party_load.states[sender_pri.PlayerID] = game_state
+
+
+@hook("WillowGame.WillowGameViewportClient:Tick", Type.POST)
+def wait_for_party_states(*_: Any) -> None:
+    """Queue the party load once every state is in, or the timeout passes."""
+    global _party_load
+    if _party_load is None:
+        wait_for_party_states.disable()
+        return
+    if not _party_load.complete and time.perf_counter() - _party_load.started_at < _PARTY_LOAD_TIMEOUT:
+        return
+
+    party_load, _party_load = _party_load, None
+    wait_for_party_states.disable()
+    host_pri = cast("WillowPlayerReplicationInfo", get_pc().PlayerReplicationInfo)
+    queue_host_request(host_pri, lambda: apply_party_load(party_load), kind="party_load")
+
+
+def apply_party_load(party_load: PartyLoad) -> None:
+    """
+    Load every collected state together, sending each player a single summary.
+
+    Weapons are loaded for every player first, since weapon changes add and remove skills. Then
+    ActiveSkills, which holds every player's skills, is walked once and the index is shared by each
+    player's skill, position and cooldown load, instead of walking it again per player.
+    """
+    weapons_loaded: list[tuple[WillowPlayerReplicationInfo, HostGameStateManager, GameState, str]] = []
+    for player_id, pri in party_load.players.items():
+        if not pri.Owner:  # Left while we were waiting
+            continue
+        game_state = party_load.states.get(player_id)
+        if game_state is None:
+            feedback(pri, "Party checkpoint loaded without you, your state didn't reach the host in time")
+            continue
+        manager = get_host_game_state_manager(pri)
+        game_state = replace(game_state)
+        if game_state.X == 0 and game_state.Y == 0:
+            feedback(pri, manager.load_game_state(game_state))  # Only says there's nothing to load
+            continue
+        weapons_loaded.append((pri, manager, game_state, manager.load_weapons(game_state)))
+    if not weapons_loaded:
+        return
+
+    skill_index = weapons_loaded[0][1].host_skill_manager.get_active_skill_index()
+    for pri, manager, game_state, merge_msg in weapons_loaded:
+        msg = manager.load_skills_and_position(game_state, merge_msg, skill_index)
+        feedback(pri, f"Party checkpoint loaded for {len(party_load.states)} players\n{msg}")
 
 
 register_module(__name__)
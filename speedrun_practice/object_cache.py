@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+import unrealsdk
+from mods_base import hook
+from unrealsdk import find_object
+from unrealsdk.hooks import Type
+from unrealsdk.unreal import WeakPointer
+
+from speedrun_practice.reloader import register_module
+
+if TYPE_CHECKING:
+    from unrealsdk.unreal import UObject
+
+
+@dataclass
+class ObjectCacheStats:
+    hits: int = 0
+    misses: int = 0
+    invalidations: int = 0
+
+    @property
+    def hit_rate(self) -> float:  # noqa: D102
+        total = self.hits + self.misses
+        return self.hits / total if total else 0
+
+    def __str__(self) -> str:
+        return (
+            f"Object cache: {len(_objects)} entries, {self.hits} hits, {self.misses} misses "
+            f"({self.hit_rate:.1%} hit rate), {self.invalidations} invalidations"
+        )
+
+
+_objects: dict[tuple[str, str], WeakPointer] = {}
+stats = ObjectCacheStats()
+
+
+def find_object_cached(cls: str, path: str) -> UObject:
+    """
+    Same as find_object, but remembers the result until the next map change.
+
+    Objects are held through weak pointers, so one that got garbage collected since it was cached is
+    looked up again rather than returned. Only successful lookups are cached, so this raises
+    ValueError the same way find_object does.
+    """
+    key = (cls, path)
+    pointer = _objects.get(key)
+    obj = pointer() if pointer is not None else None
+    if obj is not None:
+        stats.hits += 1
+        return obj
+    stats.misses += 1
+    obj = find_object(cls, path)
+    _objects[key] = WeakPointer(obj)
+    return obj
+
+
+def invalidate_object_cache() -> None:
+    """Drop all cached objects. Needed whenever objects may have been unloaded or replaced."""
+    if _objects:
+        _objects.clear()
+        stats.invalidations += 1
+
+
+def load_package(package: str) -> None:
+    """
+    Load a package, every time it's needed.
+
+    Objects loaded this way aren't rooted, so the garbage collector can take them mid map and the
+    load has to be repeated. Loading a package that's still loaded gives back the same objects, so the
+    cache is kept. Anything that did get collected fails its weak pointer check and is looked up again.
+    """
+    unrealsdk.load_package(package)
+
+
+@hook("WillowGame.WillowPlayerController:WillowClientShowLoadingMovie", Type.POST)
+def invalidate_on_map_change(*_: Any) -> None:
+    """Objects from the previous map can be garbage collected once we start travelling."""
+    invalidate_object_cache()
+
+
+register_module(__name__)
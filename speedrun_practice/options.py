@@ -2,11 +2,12 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING, Any, cast
 
-from mods_base import BaseOption, BoolOption, GroupedOption, HiddenOption, hook
+from mods_base import BaseOption, BoolOption, GroupedOption, HiddenOption, SliderOption, hook
 from unrealsdk import find_all, find_object
 from unrealsdk.hooks import Type
 
 from speedrun_practice.reloader import register_module
+from speedrun_practice.snapshots import set_auto_snapshot_interval, snapshot_ring
 from speedrun_practice.utilities import get_pc
 
 if TYPE_CHECKING:
@@ -79,6 +80,18 @@ def handle_travel_portal(option_ref: BoolOption, disable_portal: bool) -> None:
         disable_portal_hook.disable()
 
 
+def handle_auto_snapshot(option_ref: SliderOption, interval: float) -> None:
+    """Start or stop taking snapshots every interval seconds."""
+    if option_ref.mod is None or not option_ref.mod.is_enabled:
+        interval = 0
+    set_auto_snapshot_interval(interval)
+
+
+def handle_snapshot_slots(_: SliderOption, slots: float) -> None:
+    """Change how many snapshots are kept in memory."""
+    snapshot_ring.resize(int(slots))
+
+
 save_game_path = HiddenOption(identifier="Save Game Filepath", value="")
 jakobs_auto_fire = BoolOption(
     identifier="Automatic Jakobs Shotguns",
@@ -101,6 +114,14 @@ locked_and_loaded = BoolOption(
     description="When Reset to Position and Trigger Skills is pressed, trigger Locked and Loaded",
     value=False,
 )
+checkpoint_database = BoolOption(
+    identifier="Checkpoint State Database",
+    description=(
+        "Also store checkpoint game states in a database in the save folder. Keeps full precision "
+        "and is used instead of player stats when loading checkpoint states"
+    ),
+    value=False,
+)
 travel_portal_disabled = BoolOption(
     identifier="Disable Travel Portal",
     description="Disables blue tunnel animation when loading into a map",
@@ -108,17 +129,61 @@ travel_portal_disabled = BoolOption(
     on_change=handle_travel_portal,
 )
 
+snapshot_slots = SliderOption(
+    identifier="Snapshot Slots",
+    value=5,
+    min_value=1,
+    max_value=20,
+    description="Number of in-memory snapshots kept before the least recently used is replaced",
+    on_change=handle_snapshot_slots,
+)
+auto_snapshot_interval = SliderOption(
+    identifier="Auto Snapshot Interval",
+    value=0,
+    min_value=0,
+    max_value=60,
+    description="Seconds between automatic in-memory snapshots, 0 to turn off",
+    on_change=handle_auto_snapshot,
+)
+
+gear_farm_attempts = SliderOption(
+    identifier="Gear Farm Max Attempts",
+    value=200,
+    min_value=1,
+    max_value=1000,
+    description="Most vendor refreshes tried per gear source when randomizing gear before settling for the best so far",
+)
+gear_farm_budget = SliderOption(
+    identifier="Gear Farm Time Budget",
+    value=1000,
+    min_value=100,
+    max_value=10000,
+    step=100,
+    description="Milliseconds spent farming each gear source when randomizing gear before settling for the best so far",
+)
+
+snapshot_options = GroupedOption(
+    identifier="Snapshots",
+    children=[snapshot_slots, auto_snapshot_interval],
+)
 geared_sal_options = GroupedOption(
     identifier="Geared Sal",
     children=[kill_skills, incite, locked_and_loaded],
 )
+gear_farm_options = GroupedOption(
+    identifier="Any% Gaige Gear",
+    children=[gear_farm_attempts, gear_farm_budget],
+)
 
 
 options = [
     save_game_path,
     jakobs_auto_fire,
     travel_portal_disabled,
+    checkpoint_database,
+    snapshot_options,
     geared_sal_options,
+    gear_farm_options,
 ]
 
 
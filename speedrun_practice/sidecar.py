@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import time
+from dataclasses import asdict, fields
+from pathlib import Path
+
+from speedrun_practice.game_state import GameState
+from speedrun_practice.reloader import register_module
+
+try:
+    import sqlite3
+except ImportError:  # Not every Python build the SDK can run on ships sqlite
+    sqlite3 = None
+
+DB_NAME = "speedrun_practice_states.sqlite3"
+_CHUNK_SIZE = 1024 * 1024
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    file_name TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    save_name TEXT NOT NULL,
+    map_name TEXT NOT NULL,
+    saved_at REAL NOT NULL,
+    state_json TEXT NOT NULL,
+    PRIMARY KEY (file_name, content_hash)
+)
+"""
+
+_connections: dict[str, sqlite3.Connection] = {}
+
+
+def is_available() -> bool:
+    """Whether the sidecar database can be used at all."""
+    return sqlite3 is not None
+
+
+def hash_file(path: Path) -> str:
+    """Hash of a save file's contents, so we know a row still describes the file on disk."""
+    sha1 = hashlib.sha1()  # noqa: S324 Not used for security
+    with path.open("rb") as file:
+        while chunk := file.read(_CHUNK_SIZE):
+            sha1.update(chunk)
+    return sha1.hexdigest()
+
+
+def state_from_json(state_json: str) -> GameState:
+    """Build a GameState, ignoring fields a newer version of the mod might have added."""
+    names = {fld.name for fld in fields(GameState)}
+    return GameState(**{key: val for key, val in json.loads(state_json).items() if key in names})
+
+
+class CheckpointStore:
+    """
+    Game states for checkpoint saves, kept in a sqlite database next to the saves.
+
+    Rows are keyed by save filename and a hash of the file's contents, so a save that gets
+    rewritten by the game simply stops matching its old row.
+    """
+
+    def __init__(self, save_dir: str) -> None:
+        self.save_dir = Path(save_dir)
+        self.db_path = self.save_dir / DB_NAME
+
+    @property
+    def connection(self) -> sqlite3.Connection:  # noqa: D102
+        assert sqlite3 is not None
+        conn = _connections.get(str(self.db_path))
+        if conn is None:
+            conn = sqlite3.connect(self.db_path)
+            conn.execute(_SCHEMA)
+            _connections[str(self.db_path)] = conn
+        return conn
+
+    def put(self, entries: list[tuple[str, str, GameState]], map_name: str) -> None:
+        """
+        Store game states for (file name, save name, game state) entries in one transaction.
+
+        Older rows for the same files are dropped, they can't match the file on disk anymore.
+        """
+        rows = [
+            (
+                file_name,
+                hash_file(self.save_dir / file_name),
+                save_name,
+                map_name,
+                time.time(),
+                json.dumps(asdict(game_state)),
+            )
+            for file_name, save_name, game_state in entries
+        ]
+        with self.connection as conn:
+            conn.executemany(
+                "DELETE FROM checkpoints WHERE file_name = ?",
+                [(row[0],) for row in rows],
+            )
+            conn.executemany("INSERT INTO checkpoints VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+    def all_rows(self) -> list[tuple[str, str, str, str, float, str]]:
+        """Every stored row, newest first."""
+        return self.connection.execute("SELECT * FROM checkpoints ORDER BY saved_at DESC").fetchall()
+
+    def get(self, file_name: str) -> GameState | None:
+        """Get the stored game state for a save, if it matches the file currently on disk."""
+        path = self.save_dir / file_name
+        if not path.exists():
+            return None
+        row = self.connection.execute(
+            "SELECT state_json FROM checkpoints WHERE file_name = ? AND content_hash = ?",
+            (file_name, hash_file(path)),
+        ).fetchone()
+        return state_from_json(row[0]) if row else None
+
+
+register_module(__name__)
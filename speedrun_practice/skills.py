@@ -1,15 +1,18 @@
 from __future__ import annotations
 
-from dataclasses import fields
+from collections import defaultdict
+from dataclasses import dataclass, field, fields
 from typing import TYPE_CHECKING, cast
 
-from unrealsdk import construct_object, find_enum, find_object, make_struct
+from unrealsdk import construct_object, find_enum, logging, make_struct
 
 from speedrun_practice.game_state import ExternalAttributeModifiers, GradeStacks, Modifier
+from speedrun_practice.object_cache import find_object_cached
 from speedrun_practice.reloader import register_module
 from speedrun_practice.utilities import feedback, get_pc
 
 _SRP_MODIFIER_PREFIX = "SRP_"
+_MAX_SKILL_INSTANCES = 1000  # Activating more instances than this freezes or crashes the game
 
 if TYPE_CHECKING:
     from bl2 import (
@@ -19,7 +22,9 @@ if TYPE_CHECKING:
         Inventory,
         Object,
         PlayerSkillTree,
+        Skill,
         SkillDefinition,
+        SkillManager,
         WillowPlayerController,
         WillowPlayerReplicationInfo,
     )
@@ -31,6 +36,45 @@ else:
     find_enum_instinct_skill_actions = find_enum
 
 
+@dataclass
+class ResolvedSkill:
+    definition: SkillDefinition
+    grade: int
+
+
+@dataclass
+class ModifierBreakdown:
+    """Modifier totals on the tracked attributes, split by where the modifiers came from."""
+
+    inventory: ExternalAttributeModifiers = field(default_factory=ExternalAttributeModifiers)
+    skills: ExternalAttributeModifiers = field(default_factory=ExternalAttributeModifiers)
+    sprint: ExternalAttributeModifiers = field(default_factory=ExternalAttributeModifiers)
+    srp: ExternalAttributeModifiers = field(default_factory=ExternalAttributeModifiers)
+    external: ExternalAttributeModifiers = field(default_factory=ExternalAttributeModifiers)  # Mass duping
+
+
+class ActiveSkillIndex:
+    """
+    Snapshot of ActiveSkills grouped by player and skill definition name.
+
+    Walking ActiveSkills reads engine properties for every skill, so anything that needs several
+    stack counts at once should build one of these and query it instead.
+    """
+
+    def __init__(self, skill_manager: SkillManager) -> None:
+        self.skills: defaultdict[tuple[int, str], list[Skill]] = defaultdict(list)
+        for skill in skill_manager.ActiveSkills:
+            instigator = skill.SkillInstigator
+            if not instigator or not instigator.PlayerReplicationInfo:
+                continue
+            player_id = instigator.PlayerReplicationInfo.PlayerID
+            self.skills[(player_id, skill.Definition.Name)].append(skill)
+
+    def get_skills(self, player_id: int, skill_names: list[str]) -> list[Skill]:
+        """Get active skills for a player matching any of the definition names."""
+        return [skill for name in skill_names for skill in self.skills.get((player_id, name), [])]
+
+
 class HostSkillManager:
     """
     Manage skill related actions.
@@ -46,24 +90,52 @@ class HostSkillManager:
         self.skill_manager = self.pc.GetSkillManager()
         assert self.sender_pc is not None
 
-    def get_skill_definition_stacks(self, skill_names: list[str]) -> list[SkillDefinition]:
+    def get_active_skill_index(self) -> ActiveSkillIndex:
+        """Walk ActiveSkills once and index the result."""
+        return ActiveSkillIndex(self.skill_manager)
+
+    def get_skill_definition_stacks(
+        self,
+        skill_names: list[str],
+        index: ActiveSkillIndex | None = None,
+    ) -> list[SkillDefinition]:
         """Get SkillDefinition objects for active skills matching the name."""
-        return [
-            skill.Definition
-            for skill in self.skill_manager.ActiveSkills
-            if skill.Definition.Name in skill_names
-            and self.sender_pri.PlayerID == skill.SkillInstigator.PlayerReplicationInfo.PlayerID
-        ]
-
-    def get_skill_stacks_by_grade(self, skill_names: list[str]) -> GradeStacks:
+        index = index or self.get_active_skill_index()
+        return [skill.Definition for skill in index.get_skills(self.sender_pri.PlayerID, skill_names)]
+
+    def get_skill_stacks_by_grade(
+        self,
+        skill_names: list[str],
+        index: ActiveSkillIndex | None = None,
+    ) -> GradeStacks:
         """Get skill stacks at each grade."""
+        index = index or self.get_active_skill_index()
         grade_stacks = GradeStacks()
-        for skill in self.skill_manager.ActiveSkills:
-            if skill.Definition.Name in skill_names:
-                attr = f"G{skill.Grade}"
+        for skill in index.get_skills(self.sender_pri.PlayerID, skill_names):
+            attr = f"G{skill.Grade}"
+            if hasattr(grade_stacks, attr):
                 setattr(grade_stacks, attr, getattr(grade_stacks, attr) + 1)
         return grade_stacks
 
+    def resolve_skill(self, skill_path_name: str, grade: int | None = None) -> ResolvedSkill | None:
+        """Find a skill definition and the grade new instances of it should get."""
+        try:
+            skill_def = cast("SkillDefinition", find_object_cached("SkillDefinition", skill_path_name))
+        except ValueError:
+            print(f"Could not add instance of {skill_path_name}. Is the right character loaded?")
+            return None
+        return ResolvedSkill(skill_def, grade or self.get_base_grade(skill_def))
+
+    def activate_skill_instances(self, resolved: ResolvedSkill, count: int = 1) -> None:
+        """Activate instances of an already resolved skill."""
+        for _ in range(count):
+            self.skill_manager.ActivateSkill(self.sender_pc, resolved.definition, None, resolved.grade)
+
+    def deactivate_skill_instances(self, skill_def: SkillDefinition, count: int) -> None:
+        """Deactivate instances of a skill definition for the sender."""
+        for _ in range(count):
+            self.skill_manager.DeactivateSkill(self.sender_pc, skill_def)
+
     def add_skill_definition_instance(self, skill_path_name: str, grade: int | None = None) -> None:
         """
         Create new activated instance of skill definition.
@@ -71,48 +143,102 @@ class HostSkillManager:
         For unstoppable force, we need to block execution of RefreshSkillsForInstigator to keep the
         grades we saved.
         """
-        try:
-            skill_def = cast("SkillDefinition", find_object("SkillDefinition", skill_path_name))
-        except ValueError:
-            print(f"Could not add instance of {skill_path_name}. Is the right character loaded?")
-            return
-        is_player_skill, skill_state = self.pc.PlayerSkillTree.GetSkillState(
-            skill_def,
-            make_struct_skill_tree_state("SkillTreeSkillStateData"),
-        )
-        if not grade:
-            grade = 1 if not is_player_skill else skill_state.SkillGrade
-        self.skill_manager.ActivateSkill(self.sender_pc, skill_def, None, grade)
+        if resolved := self.resolve_skill(skill_path_name, grade):
+            self.activate_skill_instances(resolved)
 
-    def remove_all_skill_definition_instances(self, skill_path_name: str) -> None:
+    def remove_all_skill_definition_instances(
+        self,
+        skill_path_name: str,
+        index: ActiveSkillIndex | None = None,
+    ) -> None:
         """Remove all instances of skill definition."""
-        skill_stacks = self.get_skill_definition_stacks([skill_path_name.split(".")[-1]])
+        skill_stacks = self.get_skill_definition_stacks([skill_path_name.split(".")[-1]], index)
         if skill_stacks:
             for stack in skill_stacks:
                 self.skill_manager.DeactivateSkill(self.sender_pc, stack)
 
-    def set_skill_stacks(self, target_stacks: int, skill_path_name: str) -> None:
-        """Set stacks of skill to desired value."""
-        self.remove_all_skill_definition_instances(skill_path_name)
-        if target_stacks > 1000:  # noqa: PLR2004
-            self.add_skill_definition_instance(skill_path_name, target_stacks)
+    def get_base_grade(self, skill_def: SkillDefinition) -> int:
+        """Grade a single natural instance of the skill gets."""
+        is_player_skill, skill_state = self.sender_pc.PlayerSkillTree.GetSkillState(
+            skill_def,
+            make_struct_skill_tree_state("SkillTreeSkillStateData"),
+        )
+        return 1 if not is_player_skill else skill_state.SkillGrade
+
+    def get_logical_stacks(self, skill_name: str, index: ActiveSkillIndex | None = None) -> int:
+        """Get stack count for a skill, counting a single instance standing in for a large target as its grade."""
+        index = index or self.get_active_skill_index()
+        skills = index.get_skills(self.sender_pri.PlayerID, [skill_name])
+        if len(skills) == 1 and skills[0].Grade > _MAX_SKILL_INSTANCES:
+            return skills[0].Grade
+        return len(skills)
+
+    def set_skill_stacks(
+        self,
+        target_stacks: int,
+        skill_path_name: str,
+        index: ActiveSkillIndex | None = None,
+    ) -> None:
+        """
+        Set stacks of skill to desired value.
+
+        Only the difference between current and target stacks is activated or deactivated.
+        DeactivateSkill can't pick an instance by grade, so if any current instance has a
+        different grade than we'd add, everything is removed and re-added instead.
+        """
+        if target_stacks <= 0:
+            self.remove_all_skill_definition_instances(skill_path_name, index)
+            return
+        grade = target_stacks if target_stacks > _MAX_SKILL_INSTANCES else None
+        resolved = self.resolve_skill(skill_path_name, grade)
+        if not resolved:
+            return
+        index = index or self.get_active_skill_index()
+        current = index.get_skills(self.sender_pri.PlayerID, [resolved.definition.Name])
+
+        if target_stacks > _MAX_SKILL_INSTANCES:
             feedback(
                 self.sender_pri,
-                f"Target stacks > 1000, setting a single skill instance with grade of "
-                f"{target_stacks} to avoid crashing",
+                f"Target stacks > {_MAX_SKILL_INSTANCES}, setting a single skill instance with "
+                f"grade of {target_stacks} to avoid crashing",
             )
-            return
-        for _ in range(target_stacks):
-            self.add_skill_definition_instance(skill_path_name)
+            target_stacks = 1
+
+        if any(skill.Grade != resolved.grade for skill in current):
+            self.deactivate_skill_instances(resolved.definition, len(current))
+            self.activate_skill_instances(resolved, target_stacks)
+        elif len(current) > target_stacks:
+            self.deactivate_skill_instances(resolved.definition, len(current) - target_stacks)
+        else:
+            self.activate_skill_instances(resolved, target_stacks - len(current))
 
-    def set_skill_stacks_by_grade(self, target_stacks: GradeStacks, skill_path_name: str) -> None:
+    def set_skill_stacks_batch(self, targets: dict[str, int], index: ActiveSkillIndex | None = None) -> None:
+        """Set stacks for several skills, keyed by skill path name, from one ActiveSkills pass."""
+        index = index or self.get_active_skill_index()
+        for skill_path_name, target_stacks in targets.items():
+            self.set_skill_stacks(target_stacks, skill_path_name, index)
+
+    def set_skill_stacks_by_grade(
+        self,
+        target_stacks: GradeStacks,
+        skill_path_name: str,
+        index: ActiveSkillIndex | None = None,
+    ) -> None:
         """Set stacks individually by grade."""
         # Currently only needed for Unstoppable Force
-        self.remove_all_skill_definition_instances(skill_path_name)
-        for field in fields(target_stacks):
-            grade = int(field.name[1])  # Seems dirty but I don't really want to specify each field
-            for _ in range(getattr(target_stacks, field.name)):
-                self.add_skill_definition_instance(skill_path_name, grade)
+        current_stacks = self.get_skill_stacks_by_grade([skill_path_name.rsplit(".", maxsplit=1)[-1]], index)
+        # Grades can't be removed selectively, so only add on top when no grade has to go down.
+        if any(
+            getattr(current_stacks, grade_field.name) > getattr(target_stacks, grade_field.name)
+            for grade_field in fields(target_stacks)
+        ):
+            self.remove_all_skill_definition_instances(skill_path_name, index)
+            current_stacks = GradeStacks()
+        for grade_field in fields(target_stacks):
+            grade = int(grade_field.name[1])  # Seems dirty but I don't really want to specify each field
+            to_add = getattr(target_stacks, grade_field.name) - getattr(current_stacks, grade_field.name)
+            if to_add > 0 and (resolved := self.resolve_skill(skill_path_name, grade)):
+                self.activate_skill_instances(resolved, to_add)
 
     def trigger_kill_skills(self) -> None:
         """Trigger all kill skills for player."""
@@ -124,7 +250,7 @@ class HostSkillManager:
         try:
             attribute_def = cast(
                 "AttributeDefinition",
-                find_object("AttributeDefinition", attr_str),
+                find_object_cached("AttributeDefinition", attr_str),
             )
         except ValueError:
             print(f"Could not get attribute value for {attr_str}. Is the right character loaded?")
@@ -136,7 +262,7 @@ class HostSkillManager:
         try:
             attribute_def = cast(
                 "DesignerAttributeDefinition",
-                find_object("DesignerAttributeDefinition", designer_attr_str),
+                find_object_cached("DesignerAttributeDefinition", designer_attr_str),
             )
         except ValueError:
             print(
@@ -151,7 +277,7 @@ class HostSkillManager:
         try:
             attribute_def = cast(
                 "DesignerAttributeDefinition",
-                find_object("DesignerAttributeDefinition", designer_attr_str),
+                find_object_cached("DesignerAttributeDefinition", designer_attr_str),
             )
         except ValueError:
             print(
@@ -161,96 +287,120 @@ class HostSkillManager:
             return
         attribute_def.SetAttributeBaseValue(self.sender_pc, target_value)
 
-    def get_external_attribute_modifier_totals(
-        self,
-        include_srp: bool,
-    ) -> ExternalAttributeModifiers:
-        """Get values for each of accuracy min/max, idle regen rate, and crit bonus."""
-        ext_mods = ExternalAttributeModifiers()
+    def classify_attribute_modifiers(self) -> ModifierBreakdown:
+        """
+        Sum the modifiers on accuracy min/max, idle regen rate and crit bonus by source.
 
-        # We're going to exclude any modifiers that are applied from known sources (equipped
-        # inventory, active skills, and sprinting)
-        # First grab objects we need to check
-        equipped_inv: list[Inventory] = []
-        inv_chain = self.sender_pc.GetPawnInventoryManager().InventoryChain
-        while inv_chain:
-            equipped_inv.append(inv_chain)
-            inv_chain = inv_chain.Inventory
-        item_chain = self.sender_pc.GetPawnInventoryManager().ItemChain
-        while item_chain:
-            equipped_inv.append(item_chain)
-            item_chain = item_chain.Inventory
-        active_skills = self.sender_pc.GetSkillManager().ActiveSkills
-
-        # Create the list of modifiers to exclude
-        exclude_modifiers: list[AttributeModifier] = []
-        for inv in equipped_inv:
-            if inv:
-                exclude_modifiers.extend(
-                    [ext_mod.Modifier for ext_mod in inv.ExternalAttributeModifiers],
-                )
-        for skill in active_skills:
-            exclude_modifiers.extend(
-                [applied_skill_effect.Modifier for applied_skill_effect in skill.SkillEffects],
-            )
-        exclude_modifiers.extend(
-            [
-                applied_attribute_effect.Modifier
-                for applied_attribute_effect in self.sender_pc.SprintModifiers
-            ],
-        )
+        Modifiers from known sources (equipped inventory, active skills, and sprinting) are looked
+        up in one set, so each stack is walked once no matter how long the stacks get. Anything
+        that isn't ours or from a known source is assumed to be from mass duping.
+        """
+        breakdown = ModifierBreakdown()
+        sources = self.get_known_modifier_sources()
+        counts: defaultdict[str, int] = defaultdict(int)
 
-        def sum_modifiers(stack: list[AttributeModifier], target: Modifier) -> None:
+        def sum_modifiers(stack: list[AttributeModifier], attr_name: str) -> None:
             for modifier in stack:
-                if (
-                    modifier.Type in [0, 1]
-                    and (include_srp or _SRP_MODIFIER_PREFIX not in modifier.Name)
-                    and modifier not in exclude_modifiers
-                ):
-                    print(modifier)
-                    target.add_modifier_value(modifier)
-
-        # Get all the "orphaned" modifiers. These are assumed to be due to mass duping.
-        sum_modifiers(self.sender_pc.AccuracyPool.Data.MinValueModifierStack, ext_mods.MinValue)
-        sum_modifiers(self.sender_pc.AccuracyPool.Data.MaxValueModifierStack, ext_mods.MaxValue)
-        sum_modifiers(
-            self.sender_pc.AccuracyPool.Data.OnIdleRegenerationRateModifierStack,
-            ext_mods.OnIdleRegenerationRate,
-        )
+                if modifier.Type not in (0, 1):
+                    continue
+                source = sources.get(modifier)
+                if source is None:
+                    source = "srp" if _SRP_MODIFIER_PREFIX in modifier.Name else "external"
+                counts[source] += 1
+                getattr(getattr(breakdown, source), attr_name).add_modifier_value(modifier)
+
+        accuracy = self.sender_pc.AccuracyPool.Data
+        sum_modifiers(accuracy.MinValueModifierStack, "MinValue")
+        sum_modifiers(accuracy.MaxValueModifierStack, "MaxValue")
+        sum_modifiers(accuracy.OnIdleRegenerationRateModifierStack, "OnIdleRegenerationRate")
         sum_modifiers(
             self.sender_pc.CurrentInstantHitCriticalHitBonusModifierStack,
-            ext_mods.CurrentInstantHitCriticalHitBonus,
+            "CurrentInstantHitCriticalHitBonus",
         )
+        by_source = ", ".join(f"{source} {count}" for source, count in counts.items())
+        logging.misc(f"Attribute modifiers by source: {by_source or 'none'}")
+        return breakdown
+
+    def get_known_modifier_sources(self) -> dict[AttributeModifier, str]:
+        """Map every modifier from equipped inventory, active skills and sprinting to its ModifierBreakdown field."""
+        sources: dict[AttributeModifier, str] = {}
+        inv_manager = self.sender_pc.GetPawnInventoryManager()
+        for chain in (inv_manager.InventoryChain, inv_manager.ItemChain):
+            inv: Inventory | None = chain
+            while inv:
+                for ext_mod in inv.ExternalAttributeModifiers:
+                    sources[ext_mod.Modifier] = "inventory"
+                inv = inv.Inventory
+        for skill in self.sender_pc.GetSkillManager().ActiveSkills:
+            for applied_skill_effect in skill.SkillEffects:
+                sources[applied_skill_effect.Modifier] = "skills"
+        for applied_attribute_effect in self.sender_pc.SprintModifiers:
+            sources[applied_attribute_effect.Modifier] = "sprint"
+        return sources
+
+    def get_external_attribute_modifier_totals(
+        self,
+        include_srp: bool,
+    ) -> ExternalAttributeModifiers:
+        """Get values for each of accuracy min/max, idle regen rate, and crit bonus."""
+        breakdown = self.classify_attribute_modifiers()
+        if not include_srp:
+            return breakdown.external
+
+        ext_mods = ExternalAttributeModifiers()
+        for attr_field in fields(ExternalAttributeModifiers):
+            total = getattr(ext_mods, attr_field.name)
+            for source in (breakdown.external, breakdown.srp):
+                source_mod: Modifier = getattr(source, attr_field.name)
+                total.scale_pos += source_mod.scale_pos
+                total.scale_neg += source_mod.scale_neg
+                total.pre_add += source_mod.pre_add
         return ext_mods
 
     def set_external_attribute_modifiers(
         self,
         target_modifiers: ExternalAttributeModifiers,
     ) -> None:
-        """Add appropriate external attribute modifiers according to saved totals."""
-        # We have current modifier totals and target modifier totals.
-        # We're going to get the difference and add a modifier to the stack"""
+        """
+        Set our own attribute modifiers so external modifier totals match saved totals.
 
-        def add_trueup_modifiers(target_obj: Object, attr_name: str) -> None:
+        Each player keeps at most one SRP modifier per attribute and modifier type, found by name on
+        the attribute's modifier stack. Loading again reuses it instead of constructing another, so
+        repeated loads don't grow the stacks or the object count.
+        """
+
+        def set_trueup_modifiers(target_obj: Object, attr_name: str) -> None:
             """Need two separate modifiers for scale pos and scale neg."""
+            stack: list[AttributeModifier] = getattr(target_obj, f"{attr_name}ModifierStack")
             for modifier_type, type_name in [(0, "scale_pos"), (0, "scale_neg"), (1, "pre_add")]:
-                attr_modifier = cast(
-                    "AttributeModifier",
-                    construct_object(
-                        cls="AttributeModifier",
-                        outer=self.sender_pc,
-                        name=f"{_SRP_MODIFIER_PREFIX}{attr_name}_{type_name}",
-                    ),
-                )
-                attr_modifier.Type = modifier_type
-                attr_modifier.Value = getattr(getattr(target_modifiers, attr_name), type_name)
-                if abs(attr_modifier.Value) > 0.0001:  # noqa: PLR2004 avoiding floating point issues
-                    target_obj.AddModifier(attr_modifier, attr_name)
-
-        add_trueup_modifiers(self.sender_pc.AccuracyPool.Data, "MinValue")
-        add_trueup_modifiers(self.sender_pc.AccuracyPool.Data, "MaxValue")
-        add_trueup_modifiers(self.sender_pc.AccuracyPool.Data, "OnIdleRegenerationRate")
-        add_trueup_modifiers(self.sender_pc, "CurrentInstantHitCriticalHitBonus")
+                name = f"{_SRP_MODIFIER_PREFIX}{attr_name}_{type_name}"
+                value = getattr(getattr(target_modifiers, attr_name), type_name)
+                active = abs(value) > 0.0001  # noqa: PLR2004 avoiding floating point issues
+                attr_modifier = next((modifier for modifier in stack if modifier.Name == name), None)
+
+                if attr_modifier is None:
+                    if not active:
+                        continue
+                    attr_modifier = cast(
+                        "AttributeModifier",
+                        construct_object(cls="AttributeModifier", outer=self.sender_pc, name=name),
+                    )
+                    attr_modifier.Type = modifier_type
+                elif not active:
+                    target_obj.RemoveModifier(attr_modifier, attr_name)
+                    continue
+                elif abs(attr_modifier.Value - value) <= 0.0001:  # noqa: PLR2004
+                    continue
+                else:
+                    # Attribute values only get recalculated when the stack changes
+                    target_obj.RemoveModifier(attr_modifier, attr_name)
+                attr_modifier.Value = value
+                target_obj.AddModifier(attr_modifier, attr_name)
+
+        set_trueup_modifiers(self.sender_pc.AccuracyPool.Data, "MinValue")
+        set_trueup_modifiers(self.sender_pc.AccuracyPool.Data, "MaxValue")
+        set_trueup_modifiers(self.sender_pc.AccuracyPool.Data, "OnIdleRegenerationRate")
+        set_trueup_modifiers(self.sender_pc, "CurrentInstantHitCriticalHitBonus")
 
 
 register_module(__name__)
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from mods_base import hook
+from unrealsdk.hooks import Type
+
+from speedrun_practice.reloader import register_module
+from speedrun_practice.utilities import get_pc
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from speedrun_practice.game_state import GameState
+
+
+@dataclass
+class Snapshot:
+    game_state: GameState
+    map_name: str
+    taken_at: float
+
+
+class SnapshotRing:
+    """
+    Fixed number of in-memory game state snapshots.
+
+    Snapshots are kept in least to most recently used order. Taking a snapshot when full evicts the
+    least recently used one, and restoring a snapshot makes it the most recently used. Which snapshot
+    is current is tracked separately, stepping back goes through snapshots in the order they were
+    taken no matter how recently each was used.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self._slots: OrderedDict[int, Snapshot] = OrderedDict()
+        self._next_id = 1
+        self._cursor = 0  # Slot id of the current snapshot
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def resize(self, capacity: int) -> None:
+        """Change number of slots, evicting least recently used snapshots if needed."""
+        self.capacity = max(capacity, 1)
+        while len(self._slots) > self.capacity:
+            self._slots.popitem(last=False)
+
+    def push(self, snapshot: Snapshot) -> int:
+        """Store a snapshot as the most recently used, returning its slot id."""
+        slot_id = self._next_id
+        self._next_id += 1
+        self._slots[slot_id] = snapshot
+        self._cursor = slot_id
+        self.resize(self.capacity)
+        return slot_id
+
+    def current(self) -> tuple[int, Snapshot] | None:
+        """Current snapshot, the last one taken or stepped to. Falls back to the newest if it was evicted."""
+        if not self._slots:
+            return None
+        if self._cursor not in self._slots:
+            self._cursor = max(self._slots)
+        return self._cursor, self._slots[self._cursor]
+
+    def cycle(self) -> tuple[int, Snapshot] | None:
+        """Make the next older snapshot the current one, wrapping around to the newest."""
+        if not self._slots:
+            return None
+        older = [slot_id for slot_id in self._slots if slot_id < self._cursor]
+        self._cursor = max(older) if older else max(self._slots)
+        return self.current()
+
+    def mark_used(self, slot_id: int) -> None:
+        """Make a snapshot the most recently used, so it's the last to be evicted."""
+        if slot_id in self._slots:
+            self._slots.move_to_end(slot_id)
+
+    def clear(self) -> None:  # noqa: D102
+        self._slots.clear()
+        self._cursor = 0
+
+
+snapshot_ring = SnapshotRing(5)
+
+
+def store_snapshot(game_state: GameState) -> int:
+    """Store a game state sent back by the host."""
+    return snapshot_ring.push(Snapshot(game_state, get_pc().WorldInfo.GetMapName(True), time.time()))
+
+
+_auto_snapshot_interval: float = 0
+_last_auto_snapshot: float = 0
+_auto_snapshot_request: Callable[[], None] | None = None
+
+
+def set_auto_snapshot_request(request: Callable[[], None]) -> None:
+    """Set how auto snapshots are requested, network_funcs imports this module so it hands the request over."""
+    global _auto_snapshot_request
+    _auto_snapshot_request = request
+
+
+@hook("WillowGame.WillowGameViewportClient:Tick", Type.POST)
+def auto_snapshot_tick(*_: Any) -> None:
+    """Periodically request a snapshot while the option is on."""
+    global _last_auto_snapshot
+    now = time.perf_counter()
+    if now - _last_auto_snapshot < _auto_snapshot_interval:
+        return
+    _last_auto_snapshot = now
+    pc = get_pc()
+    if not pc or not pc.Pawn or _auto_snapshot_request is None:  # Main menu or loading screens
+        return
+    _auto_snapshot_request()
+
+
+def set_auto_snapshot_interval(seconds: float) -> None:
+    """Turn auto snapshots on for a positive interval, off for 0."""
+    global _auto_snapshot_interval, _last_auto_snapshot
+    _auto_snapshot_interval = seconds
+    _last_auto_snapshot = time.perf_counter()
+    if seconds > 0:
+        auto_snapshot_tick.enable()
+    else:
+        auto_snapshot_tick.disable()
+
+
+register_module(__name__)
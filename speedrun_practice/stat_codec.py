@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from speedrun_practice.game_state import PLAYER_STATS_MAP, ROTATION_STATS, SCALED_STATS, GameState
+from speedrun_practice.reloader import register_module
+
+# All reserved int stats we're free to use, in the order payload bits are laid out.
+PLAYER_STAT_SLOTS = tuple(PLAYER_STATS_MAP)
+# Never written by the legacy layout, so a zero here means an old checkpoint.
+HEADER_SLOT = PLAYER_STAT_SLOTS[-1]
+PAYLOAD_SLOTS = PLAYER_STAT_SLOTS[:-1]
+
+_SLOT_BITS = 32
+_HEADER_MAGIC = 0x5352  # "SR"
+_LEGACY_UF_BITS = 6
+
+
+@dataclass(frozen=True)
+class StatField:
+    """A GameState field stored as a fixed width integer, scaled by 10**precision."""
+
+    name: str
+    bits: int
+    precision: int = 0
+    signed: bool = False
+    wrap: bool = False  # Rotations wrap around instead of being clamped
+
+    @property
+    def limits(self) -> tuple[int, int]:  # noqa: D102
+        if self.signed:
+            return -(1 << (self.bits - 1)), (1 << (self.bits - 1)) - 1
+        return 0, (1 << self.bits) - 1
+
+    def encode(self, value: float) -> int:
+        """Get the unsigned bit pattern for a value."""
+        raw = round(value * 10**self.precision)
+        mask = (1 << self.bits) - 1
+        if self.wrap:
+            return raw & mask
+        low, high = self.limits
+        if not low <= raw <= high:
+            clamped = min(max(raw, low), high)
+            print(f"Capping {self.name} at {clamped / 10**self.precision}. Tried to save {value}.")
+            raw = clamped
+        return raw & mask
+
+    def decode(self, raw: int) -> float:
+        """Get the value back from its unsigned bit pattern."""
+        if self.signed and raw >= 1 << (self.bits - 1):
+            raw -= 1 << self.bits
+        if self.precision:
+            return raw / 10**self.precision
+        return raw
+
+
+@dataclass(frozen=True)
+class StatSchema:
+    version: int
+    fields: tuple[StatField, ...]
+
+    @property
+    def header(self) -> int:  # noqa: D102
+        return (_HEADER_MAGIC << 16) | self.version
+
+    @property
+    def slots_used(self) -> int:  # noqa: D102
+        bits = sum(fld.bits for fld in self.fields)
+        return -(-bits // _SLOT_BITS)
+
+
+# Packed stack counts and clips into 16 bits, clamping larger values. Only kept to read checkpoints saved with it.
+SCHEMA_V1 = StatSchema(
+    version=1,
+    fields=(
+        StatField("X", 32, 2, signed=True),
+        StatField("Y", 32, 2, signed=True),
+        StatField("Z", 32, 2, signed=True),
+        StatField("Pitch", 16, wrap=True),
+        StatField("Yaw", 16, wrap=True),
+        StatField("weapons", 17),  # Five decimal digits, active slot then merge flags
+        StatField("w1_clip", 16, signed=True),
+        StatField("w2_clip", 16, signed=True),
+        StatField("w3_clip", 16, signed=True),
+        StatField("w4_clip", 16, signed=True),
+        StatField("anarchy", 16),
+        StatField("buckup", 24),
+        StatField("freeshot", 16, signed=True),
+        StatField("expertise", 16),
+        StatField("smasher", 16),
+        StatField("SMASH", 16),
+        StatField("uf_g1", 12),
+        StatField("uf_g2", 12),
+        StatField("uf_g3", 12),
+        StatField("uf_g4", 12),
+        StatField("uf_g5", 12),
+        StatField("cooldown", 20, 2),
+        StatField("gunzerk", 20, 2),
+        StatField("c_sc_pos", 32, 4, signed=True),
+        StatField("c_sc_neg", 32, 4, signed=True),
+        StatField("c_pre", 32, 4, signed=True),
+        StatField("a_min_sc_pos", 32, 4, signed=True),
+        StatField("a_min_sc_neg", 32, 4, signed=True),
+        StatField("a_min_pre", 32, 4, signed=True),
+        StatField("a_max_sc_pos", 32, 4, signed=True),
+        StatField("a_max_sc_neg", 32, 4, signed=True),
+        StatField("a_max_pre", 32, 4, signed=True),
+        StatField("a_idle_sc_pos", 32, 4, signed=True),
+        StatField("a_idle_sc_neg", 32, 4, signed=True),
+        StatField("a_idle_pre", 32, 4, signed=True),
+    ),
+)
+# Stack counts and clips get the full int32 range the legacy layout stored them in.
+SCHEMA_V2 = StatSchema(
+    version=2,
+    fields=(
+        StatField("X", 32, 2, signed=True),
+        StatField("Y", 32, 2, signed=True),
+        StatField("Z", 32, 2, signed=True),
+        StatField("Pitch", 16, wrap=True),
+        StatField("Yaw", 16, wrap=True),
+        StatField("weapons", 17),  # Five decimal digits, active slot then merge flags
+        StatField("w1_clip", 32, signed=True),
+        StatField("w2_clip", 32, signed=True),
+        StatField("w3_clip", 32, signed=True),
+        StatField("w4_clip", 32, signed=True),
+        StatField("anarchy", 32, signed=True),
+        StatField("buckup", 32, signed=True),
+        StatField("freeshot", 32, signed=True),
+        StatField("expertise", 32, signed=True),
+        StatField("smasher", 32, signed=True),
+        StatField("SMASH", 32, signed=True),
+        StatField("uf_g1", 12),
+        StatField("uf_g2", 12),
+        StatField("uf_g3", 12),
+        StatField("uf_g4", 12),
+        StatField("uf_g5", 12),
+        StatField("cooldown", 20, 2),
+        StatField("gunzerk", 20, 2),
+        StatField("c_sc_pos", 32, 4, signed=True),
+        StatField("c_sc_neg", 32, 4, signed=True),
+        StatField("c_pre", 32, 4, signed=True),
+        StatField("a_min_sc_pos", 32, 4, signed=True),
+        StatField("a_min_sc_neg", 32, 4, signed=True),
+        StatField("a_min_pre", 32, 4, signed=True),
+        StatField("a_max_sc_pos", 32, 4, signed=True),
+        StatField("a_max_sc_neg", 32, 4, signed=True),
+        StatField("a_max_pre", 32, 4, signed=True),
+        StatField("a_idle_sc_pos", 32, 4, signed=True),
+        StatField("a_idle_sc_neg", 32, 4, signed=True),
+        StatField("a_idle_pre", 32, 4, signed=True),
+    ),
+)
+CURRENT_SCHEMA = SCHEMA_V2
+SCHEMAS = {schema.version: schema for schema in (SCHEMA_V1, SCHEMA_V2)}
+
+assert CURRENT_SCHEMA.slots_used <= len(PAYLOAD_SLOTS)
+
+
+def _to_int32(value: int) -> int:
+    return value - (1 << _SLOT_BITS) if value >= 1 << (_SLOT_BITS - 1) else value
+
+
+def slots_to_read(header: int) -> tuple[str, ...]:
+    """Which stats need reading to decode a checkpoint with the given header stat."""
+    schema = SCHEMAS.get(header & 0xFFFF) if header >> 16 == _HEADER_MAGIC else None
+    if schema is None:
+        return tuple(slot for slot, name in PLAYER_STATS_MAP.items() if name)
+    return PAYLOAD_SLOTS[: schema.slots_used]
+
+
+def encode_game_state(game_state: GameState, schema: StatSchema = CURRENT_SCHEMA) -> dict[str, int]:
+    """
+    Bit pack a GameState into values for every reserved player stat.
+
+    Unused payload slots are written as 0 so nothing from an older layout survives a resave.
+    """
+    payload = 0
+    offset = 0
+    for fld in schema.fields:
+        payload |= fld.encode(getattr(game_state, fld.name)) << offset
+        offset += fld.bits
+
+    slot_mask = (1 << _SLOT_BITS) - 1
+    stats = {slot: _to_int32((payload >> (i * _SLOT_BITS)) & slot_mask) for i, slot in enumerate(PAYLOAD_SLOTS)}
+    stats[HEADER_SLOT] = schema.header
+    return stats
+
+
+def decode_game_state(stats: dict[str, int]) -> GameState:
+    """Unpack a GameState from player stat values, using whichever layout the header says."""
+    header = stats.get(HEADER_SLOT, 0)
+    if header >> 16 != _HEADER_MAGIC:
+        return _decode_legacy(stats)
+
+    schema = SCHEMAS.get(header & 0xFFFF)
+    if schema is None:
+        print(f"Checkpoint was saved with unknown game state version {header & 0xFFFF}, can't load it.")
+        return GameState()
+
+    payload = 0
+    for i, slot in enumerate(PAYLOAD_SLOTS[: schema.slots_used]):
+        payload |= (stats.get(slot, 0) & ((1 << _SLOT_BITS) - 1)) << (i * _SLOT_BITS)
+
+    game_state = GameState()
+    for fld in schema.fields:
+        setattr(game_state, fld.name, fld.decode(payload & ((1 << fld.bits) - 1)))
+        payload >>= fld.bits
+    return game_state
+
+
+def _decode_legacy(stats: dict[str, int]) -> GameState:
+    """One stat per field, floats stored as int(val * 100) and UF packed into 6 bit grades."""
+    game_state = GameState()
+    for stats_name, name in PLAYER_STATS_MAP.items():
+        if not name:
+            continue
+        val: float = stats.get(stats_name, 0)
+        if name in SCALED_STATS:
+            val = val / 100
+        if name in ROTATION_STATS:
+            val = int(val)
+        if name == "un_force":
+            mask = (1 << _LEGACY_UF_BITS) - 1
+            for grade in range(5):
+                setattr(game_state, f"uf_g{grade + 1}", (int(val) >> (grade * _LEGACY_UF_BITS)) & mask)
+            continue
+        setattr(game_state, name, val)
+    return game_state
+
+
+register_module(__name__)
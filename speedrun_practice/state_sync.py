@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import json
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field, fields, replace
+from typing import TYPE_CHECKING, Any
+
+from speedrun_practice import net_stats
+from speedrun_practice.game_state import GameState
+from speedrun_practice.reloader import register_module
+
+if TYPE_CHECKING:
+    from bl2 import WillowPlayerReplicationInfo
+
+# Bump whenever GameState fields are added, removed or reordered, field ids are positions in GameState.
+PROTOCOL_VERSION = 1
+FIELD_NAMES = tuple(fld.name for fld in fields(GameState))
+FIELD_IDS = {name: i for i, name in enumerate(FIELD_NAMES)}
+_HISTORY = 8  # Sent states kept around as possible delta bases
+_DEFAULT_STATE = GameState()
+
+
+def _json_size(payload: Any) -> int:
+    return len(json.dumps(payload, separators=(",", ":")))
+
+
+def _changed_fields(game_state: GameState, base: GameState) -> list[list[Any]]:
+    return [
+        [field_id, getattr(game_state, name)]
+        for field_id, name in enumerate(FIELD_NAMES)
+        if getattr(game_state, name) != getattr(base, name)
+    ]
+
+
+@dataclass
+class PeerLink:
+    """
+    Game states exchanged with one peer, so states can be sent as changes from one the peer has.
+
+    Every payload carries the sequence number of the last state we received from the peer. That
+    acknowledgement tells the peer which of its sent states we're able to build on. Received states
+    are kept the same way sent ones are, so several messages built on the same acknowledgement, sent
+    before the peer hears back from us, all decode. Without a usable acknowledgement, or when the
+    peer runs a different protocol version, whole states are sent.
+    """
+
+    next_seq: int = 0
+    sent: OrderedDict[int, GameState] = field(default_factory=OrderedDict)
+    acked: int = -1
+    peer_version: int = PROTOCOL_VERSION
+    received_seq: int = -1
+    received: OrderedDict[int, GameState] = field(default_factory=OrderedDict)
+
+    def header(self) -> dict[str, int]:
+        """Version and acknowledgement, sent with every message so the peer can pick a delta base."""
+        return {"v": PROTOCOL_VERSION, "ack": self.received_seq}
+
+    def read_header(self, payload: dict[str, Any]) -> None:  # noqa: D102
+        self.peer_version = payload.get("v", 0)
+        self.acked = payload.get("ack", -1)
+
+    def encode(self, game_state: GameState, message: str) -> dict[str, Any]:
+        """Payload for a game state, as changes from the last acknowledged state where possible."""
+        payload: dict[str, Any] = self.header()
+        full_state = asdict(game_state)
+        if self.peer_version != PROTOCOL_VERSION:
+            # Field ids might not line up, so fall back to fields by name which any version can read
+            payload["full"] = full_state
+        else:
+            seq = self.next_seq
+            self.next_seq += 1
+            base = self.sent.get(self.acked)
+            payload["seq"] = seq
+            payload["base"] = self.acked if base is not None else -1
+            payload["f"] = _changed_fields(game_state, base or _DEFAULT_STATE)
+            self.sent[seq] = replace(game_state)
+            while len(self.sent) > _HISTORY:
+                self.sent.popitem(last=False)
+
+        net_stats.record_payload(
+            message,
+            _json_size(payload),
+            _json_size({**self.header(), "full": full_state}),
+            "full" in payload or payload["base"] == -1,
+        )
+        return payload
+
+    def decode(self, payload: dict[str, Any]) -> GameState | None:
+        """Get the game state back from a payload, None if it builds on a state we don't have."""
+        self.read_header(payload)
+        if "full" in payload:
+            game_state = GameState(**{key: val for key, val in payload["full"].items() if key in FIELD_IDS})
+            self._forget_received()  # Nothing the peer can build deltas on
+            return game_state
+        if payload["v"] != PROTOCOL_VERSION:
+            print(f"Peer sent game state protocol version {payload['v']}, expected {PROTOCOL_VERSION}.")
+            self._forget_received()
+            return None
+
+        base = _DEFAULT_STATE if payload["base"] == -1 else self.received.get(payload["base"])
+        if base is None:
+            print("Game state out of sync with peer, try again.")
+            self._forget_received()
+            return None
+
+        game_state = replace(base, **{FIELD_NAMES[field_id]: val for field_id, val in payload["f"]})
+        self.received_seq = payload["seq"]
+        self.received[self.received_seq] = replace(game_state)
+        while len(self.received) > _HISTORY:
+            self.received.popitem(last=False)
+        return game_state
+
+    def _forget_received(self) -> None:
+        self.received_seq = -1
+        self.received.clear()
+
+
+# Host side, one link per client. Client side, one link to the host. On the host both exist for the
+# host's own player, since host messages to itself still go through the same functions.
+_client_links: dict[int, PeerLink] = {}
+_host_link = PeerLink()
+
+
+def client_link(pri: WillowPlayerReplicationInfo) -> PeerLink:
+    """Host side link to a client."""
+    link = _client_links.get(pri.PlayerID)
+    if link is None:
+        link = _client_links[pri.PlayerID] = PeerLink()
+    return link
+
+
+def host_link() -> PeerLink:
+    """Client side link to the host."""
+    return _host_link
+
+
+def forget_client_link(player_id: int) -> None:
+    """Drop the link to a client who left, a new player reusing the id starts with full states."""
+    _client_links.pop(player_id, None)
+
+
+def reset_links() -> None:
+    """Forget every exchanged state, the next states sent in both directions will be full ones."""
+    global _host_link
+    _client_links.clear()
+    _host_link = PeerLink()
+
+
+register_module(__name__)
@@ -12,6 +12,7 @@ from mods_base import get_pc as _get_pc
 from networking import targeted
 from unrealsdk import find_object, make_struct
 
+from speedrun_practice.object_cache import find_object_cached
 from speedrun_practice.reloader import register_module
 
 if TYPE_CHECKING:
@@ -270,7 +271,7 @@ def feedback(feedback: str) -> None:
 
     local_training_message = cast(
         "LocalTrainingMessage",
-        find_object("LocalTrainingMessage", "WillowGame.Default__LocalTrainingMessage"),
+        find_object_cached("LocalTrainingMessage", "WillowGame.Default__LocalTrainingMessage"),
     )
 
     duration = (
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from speedrun_practice.reloader import register_module
+
+if TYPE_CHECKING:
+    from bl2 import WillowInventoryManager, WillowWeapon
+
+_SLOT_ORDER = (1, 2, 3, 4)
+_DROP_ORDER = (3, 4, 1, 2)  # Last picked up drops first
+
+
+def reset_weapon_slots(
+    inventory_manager: WillowInventoryManager,
+    weapons_by_slot: dict[int, WillowWeapon],
+) -> int:
+    """
+    Cancel gunzerk and reset weapon drop order. Returns the number of inventory calls.
+
+    Every weapon is removed, added back activated, then dropped and picked up again in drop order.
+    The order of the slots is worked out once up front, only slots holding a weapon get calls.
+    """
+    slots = [slot for slot in _SLOT_ORDER if weapons_by_slot.get(slot)]
+    drop_slots = [slot for slot in _DROP_ORDER if slot in slots]
+    for slot in slots:  # Cancel gunzerk
+        inventory_manager.RemoveFromInventory(weapons_by_slot[slot])
+    for slot in slots:  # Add weapons back in
+        inventory_manager.AddInventory(weapons_by_slot[slot], False)
+    for slot in drop_slots:
+        inventory_manager.RemoveFromInventory(weapons_by_slot[slot])
+        inventory_manager.AddInventory(weapons_by_slot[slot], True)
+    return 2 * len(slots) + 2 * len(drop_slots)
+
+
+register_module(__name__)
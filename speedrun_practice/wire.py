@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import base64
+import json
+import math
+import struct
+from typing import Any
+
+from speedrun_practice import net_stats
+from speedrun_practice.reloader import register_module
+
+# Keys practice network messages may use, ids are positions. Only ever append to this.
+MESSAGE_KEYS = (
+    "v",
+    "ack",
+    "seq",
+    "base",
+    "f",
+    "rid",
+    "t",
+    "wait",
+    "host",
+    "save_name",
+    "overwrite",
+    "announce",
+    "load_id",
+    "stacks",
+    "path",
+    "ops",
+)
+_MESSAGE_KEY_IDS = {key: i for i, key in enumerate(MESSAGE_KEYS)}
+
+# Value tags, stored in the low bits of each entry's key varint
+_INT = 0  # Zigzag varint
+_DEC = 1  # Zigzag varint of value * 10**_DEC_PLACES, for floats with few decimals
+_F64 = 2  # Anything else that's a float, including nan and inf
+_STR = 3
+_TRUE = 4
+_FALSE = 5
+_FIELDS = 6  # List of [GameState field id, value] pairs
+_MAP = 7  # Nested message
+_TAG_BITS = 3
+_DEC_PLACES = 4
+
+_BINARY_PREFIX = "~"  # JSON text never starts with this, so both can share the string channel
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    while value > 0x7F:  # noqa: PLR2004
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data: bytes, pos: int) -> tuple[int, int]:
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:  # noqa: PLR2004
+            return value, pos
+        shift += 7
+
+
+def _zigzag(value: int) -> int:
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def _unzigzag(value: int) -> int:
+    return value // 2 if value % 2 == 0 else -(value + 1) // 2
+
+
+def _write_entry(out: bytearray, key_id: int, value: Any) -> None:
+    """Write one key and value, picking the smallest representation that round trips exactly."""
+    if isinstance(value, bool):
+        _write_varint(out, key_id << _TAG_BITS | (_TRUE if value else _FALSE))
+    elif isinstance(value, int):
+        _write_varint(out, key_id << _TAG_BITS | _INT)
+        _write_varint(out, _zigzag(value))
+    elif isinstance(value, float):
+        scaled = value * 10**_DEC_PLACES
+        if math.isfinite(scaled) and round(scaled) / 10**_DEC_PLACES == value:
+            _write_varint(out, key_id << _TAG_BITS | _DEC)
+            _write_varint(out, _zigzag(round(scaled)))
+        else:
+            _write_varint(out, key_id << _TAG_BITS | _F64)
+            out += struct.pack("<d", value)
+    elif isinstance(value, str):
+        encoded = value.encode()
+        _write_varint(out, key_id << _TAG_BITS | _STR)
+        _write_varint(out, len(encoded))
+        out += encoded
+    elif isinstance(value, list):
+        _write_varint(out, key_id << _TAG_BITS | _FIELDS)
+        _write_varint(out, len(value))
+        for field_id, field_value in value:
+            _write_entry(out, field_id, field_value)
+    elif isinstance(value, dict):
+        _write_varint(out, key_id << _TAG_BITS | _MAP)
+        _write_map(out, value)
+    else:
+        raise TypeError(f"Can't encode {type(value).__name__} value {value!r}")
+
+
+def _write_map(out: bytearray, message: dict[str, Any]) -> None:
+    _write_varint(out, len(message))
+    for key, value in message.items():
+        _write_entry(out, _MESSAGE_KEY_IDS[key], value)
+
+
+def _read_entry(data: bytes, pos: int) -> tuple[int, Any, int]:
+    header, pos = _read_varint(data, pos)
+    key_id, tag = header >> _TAG_BITS, header & ((1 << _TAG_BITS) - 1)
+    value: Any
+    if tag == _TRUE:
+        value = True
+    elif tag == _FALSE:
+        value = False
+    elif tag == _INT:
+        raw, pos = _read_varint(data, pos)
+        value = _unzigzag(raw)
+    elif tag == _DEC:
+        raw, pos = _read_varint(data, pos)
+        value = _unzigzag(raw) / 10**_DEC_PLACES
+    elif tag == _F64:
+        (value,) = struct.unpack_from("<d", data, pos)
+        pos += 8
+    elif tag == _STR:
+        length, pos = _read_varint(data, pos)
+        value = data[pos : pos + length].decode()
+        pos += length
+    elif tag == _FIELDS:
+        count, pos = _read_varint(data, pos)
+        value = []
+        for _ in range(count):
+            field_id, field_value, pos = _read_entry(data, pos)
+            value.append([field_id, field_value])
+    else:
+        value, pos = _read_map(data, pos)
+    return key_id, value, pos
+
+
+def _read_map(data: bytes, pos: int) -> tuple[dict[str, Any], int]:
+    count, pos = _read_varint(data, pos)
+    message: dict[str, Any] = {}
+    for _ in range(count):
+        key_id, value, pos = _read_entry(data, pos)
+        message[MESSAGE_KEYS[key_id]] = value
+    return message, pos
+
+
+def _has_full_state(value: Any) -> bool:
+    if isinstance(value, dict):
+        return "full" in value or any(_has_full_state(item) for item in value.values())
+    if isinstance(value, list):
+        return any(_has_full_state(item) for item in value)
+    return False
+
+
+def _encode(message: dict[str, Any]) -> tuple[str, str]:
+    as_json = json.dumps(message, separators=(",", ":"))
+    if _has_full_state(message):
+        return as_json, as_json
+    out = bytearray()
+    _write_map(out, message)
+    binary = _BINARY_PREFIX + base64.b64encode(bytes(out)).decode()
+    return (binary if len(binary) < len(as_json) else as_json), as_json
+
+
+def encode_message(message: dict[str, Any]) -> str:
+    """
+    Pack a message for a string network function.
+
+    The binary form is sent unless JSON comes out shorter, which happens for messages that are mostly
+    a skill path once the binary is base64 encoded. Messages holding a full state by field name are
+    the fallback for peers on another protocol version, so those always stay JSON which any version
+    can read.
+    """
+    return _encode(message)[0]
+
+
+def decode_message(data: str) -> dict[str, Any]:
+    """Unpack a message from encode_message."""
+    if not data.startswith(_BINARY_PREFIX):
+        return json.loads(data)
+    message, _ = _read_map(base64.b64decode(data[len(_BINARY_PREFIX) :]), 0)
+    return message
+
+
+def pack(message_name: str, message: dict[str, Any]) -> str:
+    """Encode a message for the given network function, recording how big it was."""
+    data, as_json = _encode(message)
+    net_stats.record_wire(message_name, len(data), len(as_json))
+    return data
+
+
+register_module(__name__)
@@ -0,0 +1,63 @@
+"""
+Stand-ins for the game SDK, so modules that don't touch game objects can be tested outside the game.
+
+Only leaf modules get imported: speedrun_practice/__init__.py pulls in the whole mod and is skipped by
+registering the package without running it. The SDK names those modules import at the top level are
+stubbed out, anything that would actually touch the game isn't.
+"""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+from types import ModuleType
+from typing import TYPE_CHECKING, NoReturn
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+REPO_ROOT = Path(__file__).parent.parent
+
+
+def _stub_module(name: str, **attrs: object) -> ModuleType:
+    module = ModuleType(name)
+    module.__dict__.update(attrs)
+    sys.modules[name] = module
+    return module
+
+
+class _Logging:
+    def misc(self, msg: str) -> None:
+        pass
+
+
+class _Decorator:
+    """Stands in for hook/network function decorators, returning the function unchanged."""
+
+    def __call__(self, *_: object, **__: object) -> Callable[[Callable[..., object]], Callable[..., object]]:
+        return lambda func: func
+
+    def __getattr__(self, name: str) -> _Decorator:
+        return self
+
+
+def _not_in_tests(*_: object, **__: object) -> NoReturn:
+    raise RuntimeError("Needs the game")
+
+
+_stub_module(
+    "unrealsdk",
+    logging=_Logging(),
+    find_object=lambda *_: None,  # Only default objects get looked up at import
+    load_package=_not_in_tests,
+    make_struct=_not_in_tests,
+)
+_stub_module("unrealsdk.hooks", Type=_Decorator())
+_stub_module("unrealsdk.unreal", WeakPointer=_not_in_tests)
+_stub_module("mods_base", MODS_DIR=REPO_ROOT, get_pc=_not_in_tests, hook=_Decorator())
+_stub_module("networking", targeted=_Decorator())
+_stub_module("legacy_compat", legacy_compat=_not_in_tests)
+
+package = _stub_module("speedrun_practice")
+package.__path__ = [str(REPO_ROOT / "speedrun_practice")]
+_stub_module("speedrun_practice.reloader", register_module=lambda _: None)
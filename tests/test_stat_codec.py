@@ -0,0 +1,73 @@
+import pytest
+
+from speedrun_practice.game_state import PLAYER_STATS_MAP, GameState
+from speedrun_practice.stat_codec import (
+    CURRENT_SCHEMA,
+    HEADER_SLOT,
+    SCHEMA_V1,
+    decode_game_state,
+    encode_game_state,
+)
+
+INT32_MIN, INT32_MAX = -(2**31), 2**31 - 1
+# Stored one int32 stat each in the legacy layout
+COUNT_FIELDS = ("anarchy", "buckup", "freeshot", "expertise", "smasher", "SMASH", "w1_clip", "w2_clip", "w3_clip", "w4_clip")
+
+
+def sample_state() -> GameState:
+    return GameState(
+        anarchy=600,
+        buckup=3,
+        freeshot=-1,
+        weapons=21011,
+        expertise=9,
+        smasher=40,
+        SMASH=2,
+        uf_g1=5,
+        uf_g5=63,
+        cooldown=12.34,
+        gunzerk=3.5,
+        X=-20543.21,
+        Y=1234.5,
+        Z=-96.01,
+        Pitch=65000,
+        Yaw=123,
+        w1_clip=36,
+        w2_clip=-1,
+        c_sc_pos=0.0125,
+        a_idle_pre=-2.5,
+    )
+
+
+def test_round_trip() -> None:
+    state = sample_state()
+    assert decode_game_state(encode_game_state(state)) == state
+
+
+@pytest.mark.parametrize("value", [INT32_MIN, INT32_MAX, 2**16, 99999])
+def test_counts_keep_legacy_range(value: int) -> None:
+    state = GameState(**dict.fromkeys(COUNT_FIELDS, value))
+    assert decode_game_state(encode_game_state(state)) == state
+
+
+def test_legacy_maximums_survive_resave() -> None:
+    legacy = dict.fromkeys(PLAYER_STATS_MAP, 0)
+    for slot, name in PLAYER_STATS_MAP.items():
+        if name in COUNT_FIELDS:
+            legacy[slot] = INT32_MAX
+    state = decode_game_state(legacy)
+    assert decode_game_state(encode_game_state(state)) == state
+
+
+def test_older_schema_still_decodes() -> None:
+    state = sample_state()
+    stats = encode_game_state(state, SCHEMA_V1)
+    assert stats[HEADER_SLOT] != encode_game_state(state)[HEADER_SLOT]
+    assert decode_game_state(stats) == state
+
+
+def test_unused_slots_zeroed() -> None:
+    stats = encode_game_state(sample_state())
+    assert len(stats) == len(PLAYER_STATS_MAP)
+    payload_slots = [slot for slot in PLAYER_STATS_MAP if slot != HEADER_SLOT]
+    assert all(stats[slot] == 0 for slot in payload_slots[CURRENT_SCHEMA.slots_used :])
@@ -0,0 +1,65 @@
+from speedrun_practice.weapon_slots import reset_weapon_slots
+
+
+class FakeInventoryManager:
+    """Records inventory calls and keeps the chain in the order weapons were added."""
+
+    def __init__(self, weapons: list[str]) -> None:
+        self.chain = list(weapons)
+        self.calls: list[tuple[str, str, bool | None]] = []
+
+    def RemoveFromInventory(self, weapon: str) -> None:
+        self.calls.append(("remove", weapon, None))
+        self.chain.remove(weapon)
+
+    def AddInventory(self, weapon: str, do_not_activate: bool) -> None:
+        self.calls.append(("add", weapon, do_not_activate))
+        self.chain.append(weapon)
+
+
+def baseline_reset(manager: FakeInventoryManager, weapons_by_slot: dict[int, str]) -> None:
+    """The original three pass reset, for comparison."""
+    for slot in [1, 2, 3, 4]:
+        if weapons_by_slot.get(slot):
+            manager.RemoveFromInventory(weapons_by_slot[slot])
+    for slot in [1, 2, 3, 4]:
+        if weapons_by_slot.get(slot):
+            manager.AddInventory(weapons_by_slot[slot], False)
+    for slot in [3, 4, 1, 2]:
+        if weapons_by_slot.get(slot):
+            manager.RemoveFromInventory(weapons_by_slot[slot])
+            manager.AddInventory(weapons_by_slot[slot], True)
+
+
+def run_both(weapons_by_slot: dict[int, str]) -> tuple[FakeInventoryManager, FakeInventoryManager, int]:
+    weapons = list(weapons_by_slot.values())
+    baseline, current = FakeInventoryManager(weapons), FakeInventoryManager(weapons)
+    baseline_reset(baseline, weapons_by_slot)
+    reported = reset_weapon_slots(current, weapons_by_slot)  # type: ignore
+    return baseline, current, reported
+
+
+def test_full_loadout_matches_baseline() -> None:
+    baseline, current, reported = run_both({1: "pistol", 2: "shotgun", 3: "smg", 4: "launcher"})
+    assert current.calls == baseline.calls
+    assert current.chain == ["smg", "launcher", "pistol", "shotgun"]
+    assert reported == len(current.calls) == 16
+
+
+def test_every_weapon_gets_activated_before_drop_order() -> None:
+    _, current, _ = run_both({1: "pistol", 2: "shotgun", 3: "smg", 4: "launcher"})
+    activating = [weapon for op, weapon, do_not_activate in current.calls if op == "add" and do_not_activate is False]
+    assert activating == ["pistol", "shotgun", "smg", "launcher"]
+
+
+def test_empty_slots_get_no_calls() -> None:
+    baseline, current, reported = run_both({2: "shotgun", 4: "launcher"})
+    assert current.calls == baseline.calls
+    assert current.chain == ["launcher", "shotgun"]
+    assert reported == len(current.calls) == 8
+
+
+def test_no_weapons() -> None:
+    _, current, reported = run_both({})
+    assert current.calls == []
+    assert reported == 0
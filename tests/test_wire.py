@@ -0,0 +1,137 @@
+import json
+import math
+import random
+
+import pytest
+
+from speedrun_practice import net_stats
+from speedrun_practice.wire import decode_message, encode_message, pack
+
+
+def json_size(message: dict[str, object]) -> int:
+    return len(json.dumps(message, separators=(",", ":")))
+
+
+def round_trip(message: dict[str, object]) -> dict[str, object]:
+    return decode_message(encode_message(message))
+
+
+@pytest.mark.parametrize(
+    "message",
+    [
+        {},
+        {"v": 1, "ack": -1},
+        {"seq": 0, "base": -1, "f": []},
+        {"f": [[0, 0], [1, -1], [2, 2**40], [3, -(2**63)], [4, 10**30]]},
+        {"f": [[5, 1.5], [6, -0.0001], [7, 0.1 + 0.2], [8, 1e300], [9, -123456.789]]},
+        {"f": [[10, True], [11, False], [12, ""], [13, "Tundra Express - ünïcode ✓"]]},
+        {"f": [[200, 1], [5000, 2]]},  # Field ids past one varint byte
+        {"rid": 3, "t": {"rid": 3, "wait": 0.00123456789, "host": 1e-9}},
+        {"save_name": "Checkpoint 12", "overwrite": True, "announce": False, "load_id": 7},
+    ],
+)
+def test_round_trip(message: dict[str, object]) -> None:
+    assert round_trip(message) == message
+
+
+def test_round_trip_keeps_types() -> None:
+    decoded = round_trip({"f": [[0, 1], [1, 1.0], [2, True]]})
+    assert [type(value) for _, value in decoded["f"]] == [int, float, bool]  # type: ignore
+
+
+def test_non_finite_floats() -> None:
+    decoded = round_trip({"f": [[0, math.inf], [1, -math.inf], [2, math.nan]]})
+    values = [value for _, value in decoded["f"]]  # type: ignore
+    assert values[0] == math.inf
+    assert values[1] == -math.inf
+    assert math.isnan(values[2])
+
+
+def test_random_round_trips() -> None:
+    rng = random.Random(49)
+    values = [
+        lambda: rng.randint(-(10**12), 10**12),
+        lambda: round(rng.uniform(-1e5, 1e5), rng.randrange(6)),
+        rng.random,
+        lambda: rng.random() < 0.5,
+        lambda: "x" * rng.randrange(300),
+    ]
+    for _ in range(2000):
+        message = {
+            "seq": rng.randrange(10**6),
+            "f": [[rng.randrange(300), rng.choice(values)()] for _ in range(rng.randrange(20))],
+        }
+        assert round_trip(message) == message
+
+
+def test_full_states_stay_json() -> None:
+    message = {"v": 2, "ack": -1, "full": {"X": 1.5, "weapons": "1234"}}
+    encoded = encode_message(message)
+    assert json.loads(encoded) == message
+    assert decode_message(encoded) == message
+
+
+def test_unknown_key_raises() -> None:
+    with pytest.raises(KeyError):
+        encode_message({"not_a_message_key": 1})
+
+
+# One of each message the network functions send. Deltas are a full set of changes from the
+# default state and a typical small change between two states.
+FULL_DELTA = [[i, round(1234.5678 - i * 7.25, 4)] for i in range(12)] + [[12, "4312"], [13, True]] + [[i, i * 3] for i in range(14, 30)]
+SMALL_DELTA = [[0, 1301.25], [1, -2280.5], [2, 140.0], [21, 5]]
+TIMING = {"rid": 41, "wait": 0.0021, "host": 0.0153}
+MESSAGES = {
+    "host_save_checkpoint": {"v": 1, "ack": 12, "rid": 41, "save_name": "Bunker skip", "overwrite": False},
+    "host_get_game_state": {"v": 1, "ack": 12, "rid": 41},
+    "host_take_snapshot": {"v": 1, "ack": 12, "rid": 41, "announce": True},
+    "client_send_party_state": {"v": 1, "ack": 12, "load_id": 3},
+    "client_save_checkpoint": {"v": 1, "ack": 7, "seq": 13, "base": -1, "f": FULL_DELTA, "t": TIMING, "save_name": "Bunker skip", "overwrite": False},
+    "client_log_game_state": {"v": 1, "ack": 7, "seq": 14, "base": 13, "f": SMALL_DELTA, "t": TIMING},
+    "client_store_snapshot": {"v": 1, "ack": 7, "seq": 15, "base": 14, "f": SMALL_DELTA, "t": TIMING, "announce": True},
+    "host_load_checkpoint": {"v": 1, "ack": 15, "seq": 8, "base": -1, "f": FULL_DELTA, "rid": 42},
+    "host_party_state": {"v": 1, "ack": 15, "seq": 9, "base": 8, "f": SMALL_DELTA, "load_id": 3},
+    "host_request_batch": {
+        "ops": [
+            [3, {"v": 1, "ack": 7, "seq": 16, "base": -1, "f": FULL_DELTA}],
+            [0, {"stacks": 1, "path": "GD_Mercenary_Skills.Brawn.Incite_Active"}],
+            [2, {}],
+        ],
+    },
+}
+# Mostly a skill path, which base64 would make longer than the JSON
+PATH_MESSAGES = {
+    "host_set_skill_stacks": {"stacks": 40, "path": "GD_Tulip_Mechromancer_Skills.BestFriendsForever.UnstoppableForce"},
+    "host_set_designer_attribute_value": {"stacks": 600, "path": "GD_Tulip_Mechromancer_Skills.Misc.Att_Anarchy_NumberOfStacks"},
+    "host_request_batch": {"ops": [[0, {"stacks": 1, "path": "GD_Mercenary_Skills.Gun_Lust.LockedAndLoaded_Active"}], [2, {}]]},
+}
+
+
+@pytest.mark.parametrize("name", MESSAGES)
+def test_size_reduction(name: str) -> None:
+    message = MESSAGES[name]
+    wire_size, as_json = len(encode_message(message)), json_size(message)
+    print(f"{name}: {as_json} bytes as JSON, {wire_size} encoded ({1 - wire_size / as_json:.0%} smaller)")
+    assert round_trip(message) == message
+    assert wire_size < as_json * 0.7
+
+
+@pytest.mark.parametrize("name", PATH_MESSAGES)
+def test_never_bigger_than_json(name: str) -> None:
+    message = PATH_MESSAGES[name]
+    assert len(encode_message(message)) <= json_size(message)
+    assert round_trip(message) == message
+
+
+def test_nested_full_states_stay_json() -> None:
+    message = {"ops": [[3, {"v": 2, "ack": -1, "full": {"X": 1.5}}], [2, {}]]}
+    assert json.loads(encode_message(message)) == message
+    assert round_trip(message) == message
+
+
+def test_pack_records_sizes() -> None:
+    net_stats.reset()
+    message = MESSAGES["client_log_game_state"]
+    data = pack("client_log_game_state", message)
+    stats = net_stats.wire["client_log_game_state"]
+    assert (stats.messages, stats.wire_bytes, stats.json_bytes) == (1, len(data), json_size(message))